@@ -2,6 +2,7 @@ import logging
 from .TelegramClient import TelegramClient
 from .CalenderClient import CalenderClient
 from Handlers import PreferencesHandler
+from Handlers.Preferences import preferences_store
 from telegram import Update
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
@@ -10,12 +11,6 @@ from Config.menus import (
     HELP_TEXT, BACK_BUTTONS, MENU_CONFIGS
 )
 from Config.config import DEBUG
-from telegram.constants import ParseMode
-from telegram.ext import ContextTypes
-from Config.menus import (
-    MAIN_MENU, PREFERENCES_MENU, AVAILABILITY_MENU, DOCS_MENU,
-    HELP_TEXT, BACK_BUTTONS, MENU_CONFIGS
-)
 
 
 
@@ -94,9 +89,8 @@ class MainClient:
         await query.answer()  # Acknowledge the button press
         data = query.data
         
-        # Route to PreferencesHandler first
-        if await self.preferences_handler.can_handle(data):
-            await self.preferences_handler.handle_callback(query, data, context)
+        # Route to PreferencesHandler first; it reports whether it took the callback
+        if await self.preferences_handler.handle_callback(query, data, context):
             return
         
         # Handle main navigation
@@ -108,7 +102,6 @@ class MainClient:
             )
         
         elif data == "preferences_menu":  # Updated from defaults_menu
-            from Config.menus import PREFERENCES_MENU
             await query.edit_message_text(
                 PREFERENCES_MENU["title"],
                 reply_markup=self._build_menu(PREFERENCES_MENU),
@@ -216,6 +209,10 @@ class MainClient:
         logger.info("🤖 Starting Shifts Bot...")
         logger.info("✅ Handlers registered. Use /start in Telegram.")
         logger.info("Press Ctrl+C to stop.")
-        self.telegram_client.run_polling(drop_pending_updates=True)
+        try:
+            self.telegram_client.run_polling(drop_pending_updates=True)
+        finally:
+            # Write any preference changes still waiting in the batch window
+            preferences_store.flush()
 
 
@@ -4,6 +4,7 @@ Handles default shift times, user preferences, and time validation.
 """
 
 import os
+import threading
 from datetime import datetime
 from typing import Dict, Any, Optional
 import logging
@@ -24,6 +25,15 @@ class ShiftTimeManager:
 
         # Initialize user times
         self.user_times = {k: v.copy() for k, v in self.default_times.items()}
+        # Cached get_shift_times_display() text, cleared whenever times change
+        self._display_cache: Optional[str] = None
+
+        # Changes run in worker threads (asyncio.to_thread) as well as on the event loop:
+        # _lock guards user_times and the display cache, _write_lock orders file writes
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._version = 0  # Bumped on every change
+        self._written_version = 0
         self._load_user_times()
 
     def _load_user_times(self):
@@ -48,12 +58,32 @@ class ShiftTimeManager:
         # Always persist merged state
         self._save_user_times()
 
+    def _snapshot_locked(self):
+        """Record a change to user_times; call with self._lock held.
+
+        Clears the display cache and returns (version, copy of user_times) for _write.
+        """
+        self._display_cache = None
+        self._version += 1
+        return self._version, {k: v.copy() for k, v in self.user_times.items()}
+
+    def _write(self, pending):
+        """Write a snapshot from _snapshot_locked, unless a newer one was already written."""
+        version, data = pending
+        with self._write_lock:
+            if version <= self._written_version:
+                return
+            try:
+                atomic_write_json(self.config_file, data)
+                self._written_version = version
+            except Exception:
+                logging.getLogger(__name__).exception("Failed to save shift times")
+
     def _save_user_times(self):
         """Save current user_times to file."""
-        try:
-            atomic_write_json(self.config_file, self.user_times)
-        except Exception:
-            logging.getLogger(__name__).exception("Failed to save shift times")
+        with self._lock:
+            pending = self._snapshot_locked()
+        self._write(pending)
 
     def _is_valid_time(self, time_str: str) -> bool:
         """Validate time format (HH:MM)."""
@@ -71,10 +101,13 @@ class ShiftTimeManager:
 
     def get_shift_times_display(self) -> str:
         """Generate formatted shift times display text."""
-        return "\n".join(
-            f"• {config['emoji']} {config['name']}: {config['start']}-{config['end']}"
-            for config in self.user_times.values()
-        )
+        with self._lock:
+            if self._display_cache is None:
+                self._display_cache = "\n".join(
+                    f"• {config['emoji']} {config['name']}: {config['start']}-{config['end']}"
+                    for config in self.user_times.values()
+                )
+            return self._display_cache
 
     def update_shift_time(self, shift_type: str, start_time: str = None, end_time: str = None) -> bool:
         """Update shift time for a specific shift type."""
@@ -86,31 +119,36 @@ class ShiftTimeManager:
         if end_time and not self._is_valid_time(end_time):
             return False
 
-        if start_time:
-            self.user_times[shift_type]["start"] = start_time
-        if end_time:
-            self.user_times[shift_type]["end"] = end_time
-
-        self._save_user_times()
+        with self._lock:
+            if start_time:
+                self.user_times[shift_type]["start"] = start_time
+            if end_time:
+                self.user_times[shift_type]["end"] = end_time
+            pending = self._snapshot_locked()
+        self._write(pending)
         return True
 
     def reset_shift_times(self):
         """Reset all shift times to defaults."""
-        for shift_type, default_config in self.default_times.items():
-            self.user_times[shift_type].update({
-                "start": default_config["start"],
-                "end": default_config["end"]
-            })
-        self._save_user_times()
+        with self._lock:
+            for shift_type, default_config in self.default_times.items():
+                self.user_times[shift_type].update({
+                    "start": default_config["start"],
+                    "end": default_config["end"]
+                })
+            pending = self._snapshot_locked()
+        self._write(pending)
 
     def reset_shift_time(self, shift_type: str):
         """Reset specific shift type to default."""
         if shift_type in self.default_times:
-            self.user_times[shift_type].update({
-                "start": self.default_times[shift_type]["start"],
-                "end": self.default_times[shift_type]["end"]
-            })
-            self._save_user_times()
+            with self._lock:
+                self.user_times[shift_type].update({
+                    "start": self.default_times[shift_type]["start"],
+                    "end": self.default_times[shift_type]["end"]
+                })
+                pending = self._snapshot_locked()
+            self._write(pending)
 
     def get_shift_duration(self, shift_type: str) -> Optional[float]:
         """Get shift duration in hours."""
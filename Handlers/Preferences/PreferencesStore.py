@@ -0,0 +1,92 @@
+"""
+Preferences Store - Coalesces preference file writes across handlers.
+Handlers hand over their latest data and the store writes each file at most once per flush window.
+"""
+
+import asyncio
+import copy
+import logging
+import os
+import threading
+from utils import atomic_write_json
+
+
+logger = logging.getLogger(__name__)
+
+
+class PreferencesStore:
+    """Batches JSON preference writes so a burst of changes hits disk once per file."""
+
+    # Seconds to wait after the first change before writing the batch
+    FLUSH_DELAY = 0.5
+
+    def __init__(self):
+        self._pending = {}  # path -> (seq, data snapshot, on_error); latest save per path wins
+        self._seq = 0
+        self._written = {}  # path -> seq of the snapshot last written
+        self._lock = threading.Lock()
+        self._flush_handle = None
+        self._flush_task = None
+
+    def save(self, path: str, data, on_error=None) -> None:
+        """Schedule `data` to be written to `path` as JSON.
+
+        The data is snapshotted now, so callers may keep mutating their copy. Without a
+        running event loop (startup, scripts) the file is written immediately.
+        If the write fails, `on_error(path, data)` is called (possibly from a worker thread).
+        """
+        self._seq += 1
+        self._pending[path] = (self._seq, copy.deepcopy(data), on_error)
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+
+        if self._flush_handle is None and self._flush_task is None:
+            self._flush_handle = loop.call_later(self.FLUSH_DELAY, self._start_flush)
+
+    def flush(self) -> None:
+        """Write all pending data now (blocking). Call on shutdown."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        self._write_all(pending)
+
+    def _start_flush(self):
+        """Timer callback: write the pending batch in a worker thread."""
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        self._flush_task = asyncio.get_running_loop().create_task(self._flush_async(pending))
+
+    async def _flush_async(self, pending):
+        try:
+            await asyncio.to_thread(self._write_all, pending)
+        finally:
+            self._flush_task = None
+            # Changes that arrived while writing get their own window
+            if self._pending and self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.FLUSH_DELAY, self._start_flush)
+
+    def _write_all(self, pending):
+        with self._lock:
+            for path, (seq, data, on_error) in pending.items():
+                # Never let an older batch overwrite a newer one (e.g. shutdown flush vs. in-flight write)
+                if self._written.get(path, 0) > seq:
+                    continue
+                try:
+                    dirname = os.path.dirname(path)
+                    if dirname:
+                        os.makedirs(dirname, exist_ok=True)
+                    atomic_write_json(path, data)
+                    self._written[path] = seq
+                except Exception:
+                    logger.exception("Failed to save preferences to %s", path)
+                    if on_error is not None:
+                        on_error(path, data)
+
+
+# Global instance shared by all preference handlers
+preferences_store = PreferencesStore()
@@ -8,42 +8,115 @@ from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 import os
 import logging
-from utils import atomic_read_json, atomic_write_json
+from collections import OrderedDict
+from utils import atomic_read_json
+from .PreferencesStore import preferences_store
+
+
+logger = logging.getLogger(__name__)
 
 
 class RemindersHandler:
     """Handles all reminder-related preferences."""
     
+    # Default reminder settings (minutes before shift are kept immutable and, like every
+    # stored before_shift list, sorted ascending)
+    _DEFAULT_BEFORE_SHIFT: tuple = (15, 30)
+    _DEFAULT_ENABLED = True
+    _DEFAULT_SOUND = True
+    
+    # Fixed-shape response templates (single %s slot)
+    _MSG_ADDED = "✅ <b>התראה של %s דקות נוספה</b>"
+    _MSG_EXISTS = "⚠️ התראה של %s דקות כבר קיימת"
+    _MSG_REMOVED = "✅ <b>התראה הוסרה</b>\n\nהתראה של %s לפני המשמרת הוסרה בהצלחה."
+    _MSG_NOT_FOUND = "❌ <b>שגיאה</b>\n\nהתראה של %s דקות לא נמצאה."
+    
+    # Callback data routed to this handler (merged into PreferencesHandler's dispatch table)
+    EXACT_CALLBACKS = frozenset({
+        "toggle_reminders", "add_reminder", "show_remove_reminders",
+        "toggle_sound", "reset_reminders", "add_custom_reminder",
+    })
+    CALLBACK_PREFIXES = ("edit_reminders", "add_reminder_", "remove_reminder_")
+    
+    # Per-user files are sharded as reminders/<user_id // 1000>/<user_id>.json
+    _SHARD_SIZE = 1000
+    # Number of users whose reminders are kept in memory
+    _CACHE_SIZE = 256
+    
     def __init__(self, telegram_client):
         self.telegram_client = telegram_client
-        self.config_file = "user_reminders.json"
-        self.default_reminders = {
-            "before_shift": [30, 15],  # Minutes before shift
-            "enabled": True,
-            "sound_enabled": True
+        self.config_dir = "reminders"
+        # Pre-sharding file keyed by user id, used to seed a user without their own file
+        self.legacy_config_file = "user_reminders.json"
+        self._cache = OrderedDict()
+        
+        # Static keyboards reused by every response
+        self._back_kb = telegram_client.inline_kb([[("🔙 חזרה", "edit_reminders")]])
+        self._settings_back_kb = telegram_client.inline_kb([[("🔙 חזרה להגדרות התראות", "edit_reminders")]])
+    
+    def _fresh_defaults(self):
+        """Build a new default reminders dict (never shared between resets)."""
+        return {
+            "before_shift": list(self._DEFAULT_BEFORE_SHIFT),
+            "enabled": self._DEFAULT_ENABLED,
+            "sound_enabled": self._DEFAULT_SOUND
         }
-        self.user_reminders = self._load_reminders()
     
-    def _load_reminders(self):
-        """Load user reminder preferences."""
-        data = atomic_read_json(self.config_file, default=None)
+    def _path_for(self, user_id: int) -> str:
+        """Return the sharded reminders file path for a user."""
+        return os.path.join(self.config_dir, str(user_id // self._SHARD_SIZE), f"{user_id}.json")
+    
+    def _load_reminders(self, user_id: int):
+        """Load a user's reminder preferences."""
+        data = atomic_read_json(self._path_for(user_id), default=None)
+        if data is None:
+            data = self._load_legacy_reminders(user_id)
         if data is None:
-            return self.default_reminders.copy()
+            return self._fresh_defaults()
+        # Display code relies on before_shift staying sorted ascending
+        data.get("before_shift", []).sort()
         return data
     
-    def _save_reminders(self):
-        """Save reminder preferences to file."""
-        try:
-            atomic_write_json(self.config_file, self.user_reminders)
-        except Exception as e:
-            logging.getLogger(__name__).exception("Error saving reminders: %s", e)
+    def _load_legacy_reminders(self, user_id: int):
+        """Return the user's own entry from the legacy file, or None.
+
+        An entry is migrated only when keyed by this user's id; the old single-user
+        format has no owner, so it is never copied into anyone's reminders.
+        """
+        legacy = atomic_read_json(self.legacy_config_file, default=None)
+        if not isinstance(legacy, dict):
+            return None
+        data = legacy.get(str(user_id))
+        return data if isinstance(data, dict) else None
+    
+    def _get_reminders(self, user_id: int):
+        """Return a user's reminders, served from the in-memory LRU when possible."""
+        reminders = self._cache.get(user_id)
+        if reminders is None:
+            reminders = self._cache[user_id] = self._load_reminders(user_id)
+            if len(self._cache) > self._CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(user_id)
+        return reminders
+    
+    def _reset_user(self, user_id: int):
+        """Replace a user's reminders with fresh defaults and return them."""
+        reminders = self._cache[user_id] = self._fresh_defaults()
+        self._cache.move_to_end(user_id)
+        return reminders
     
-    async def can_handle(self, data: str) -> bool:
+    def _save_reminders(self, user_id: int):
+        """Queue a user's reminder preferences for the next batched write."""
+        preferences_store.save(self._path_for(user_id), self._get_reminders(user_id))
+    
+    async def _reply(self, query, html: str, kb=None):
+        """Edit the callback message with HTML text, defaulting to the back keyboard."""
+        await query.edit_message_text(html, reply_markup=kb or self._back_kb, parse_mode=ParseMode.HTML)
+    
+    def can_handle(self, data: str) -> bool:
         """Check if this handler can process the given callback data."""
-        return data.startswith("edit_reminders") or data.startswith("add_reminder_") or data.startswith("remove_reminder_") or data in [
-            "toggle_reminders", "add_reminder", "remove_reminder", "show_remove_reminders",
-            "toggle_sound", "reset_reminders", "add_custom_reminder"
-        ]
+        return data in self.EXACT_CALLBACKS or data.startswith(self.CALLBACK_PREFIXES)
     
     async def handle_callback(self, query, data: str, context: ContextTypes.DEFAULT_TYPE) -> bool:
         """Handle reminder callback actions."""
@@ -65,7 +138,7 @@ class RemindersHandler:
             return True
         
         elif data.startswith("add_reminder_"):
-            minutes = int(data.replace("add_reminder_", ""))
+            minutes = int(data.removeprefix("add_reminder_"))
             await self._add_reminder(query, minutes)
             return True
         
@@ -78,20 +151,24 @@ class RemindersHandler:
             return True
         
         elif data.startswith("remove_reminder_"):
-            minutes = int(data.replace("remove_reminder_", ""))
+            minutes = int(data.removeprefix("remove_reminder_"))
             await self._remove_reminder(query, minutes)
             return True
         
         elif data == "reset_reminders":
             await self._reset_reminders(query)
             return True
+        
+        return False  # Action not handled by this handler
     
     async def _show_reminders_menu(self, query):
         """Show the reminders configuration menu."""
-        formatted_reminders = [self._format_time(m) for m in self.user_reminders["before_shift"]]
+        user_id = query.from_user.id
+        reminders = self._get_reminders(user_id)
+        formatted_reminders = [self._format_time(m) for m in reminders["before_shift"]]
         reminders_list = ", ".join(formatted_reminders) if formatted_reminders else "אין התראות"
-        status = "פעיל" if self.user_reminders["enabled"] else "כבוי"
-        sound_status = "פעיל" if self.user_reminders["sound_enabled"] else "כבוי"
+        status = "פעיל" if reminders["enabled"] else "כבוי"
+        sound_status = "פעיל" if reminders["sound_enabled"] else "כבוי"
         
         buttons = [
             [
@@ -108,43 +185,35 @@ class RemindersHandler:
             ]
         ]
         
-        await query.edit_message_text(
+        await self._reply(
+            query,
             f"🔔 <b>הגדרות התראות</b>\n\n"
             f"סטטוס: {status}\n"
             f"צליל: {sound_status}\n"
             f"התראות: {reminders_list or 'אין'}\n\n"
             f"בחר פעולה:",
-            reply_markup=self.telegram_client.inline_kb(buttons),
-            parse_mode=ParseMode.HTML
+            self.telegram_client.inline_kb(buttons)
         )
     
     async def _toggle_reminders(self, query):
         """Toggle reminders on/off."""
-        self.user_reminders["enabled"] = not self.user_reminders["enabled"]
-        self._save_reminders()
+        user_id = query.from_user.id
+        reminders = self._get_reminders(user_id)
+        reminders["enabled"] = not reminders["enabled"]
+        self._save_reminders(user_id)
         
-        status = "הופעלו" if self.user_reminders["enabled"] else "כובו"
-        await query.edit_message_text(
-            f"🔔 <b>התראות {status}</b>",
-            reply_markup=self.telegram_client.inline_kb([
-                [("🔙 חזרה", "edit_reminders")]
-            ]),
-            parse_mode=ParseMode.HTML
-        )
+        status = "הופעלו" if reminders["enabled"] else "כובו"
+        await self._reply(query, f"🔔 <b>התראות {status}</b>")
     
     async def _toggle_sound(self, query):
         """Toggle sound on/off."""
-        self.user_reminders["sound_enabled"] = not self.user_reminders["sound_enabled"]
-        self._save_reminders()
+        user_id = query.from_user.id
+        reminders = self._get_reminders(user_id)
+        reminders["sound_enabled"] = not reminders["sound_enabled"]
+        self._save_reminders(user_id)
         
-        status = "הופעל" if self.user_reminders["sound_enabled"] else "כובה"
-        await query.edit_message_text(
-            f"🔊 <b>צליל התראות {status}</b>",
-            reply_markup=self.telegram_client.inline_kb([
-                [("🔙 חזרה", "edit_reminders")]
-            ]),
-            parse_mode=ParseMode.HTML
-        )
+        status = "הופעל" if reminders["sound_enabled"] else "כובה"
+        await self._reply(query, f"🔊 <b>צליל התראות {status}</b>")
     
     async def _show_add_reminder_menu(self, query, context: ContextTypes.DEFAULT_TYPE):
         """Show menu to add new reminder."""
@@ -155,68 +224,57 @@ class RemindersHandler:
             [("🔙 חזרה", "edit_reminders")]
         ]
         
-        await query.edit_message_text(
+        await self._reply(
+            query,
             f"⏰ <b>הוסף התראה חדשה</b>\n\n"
             f"בחר כמה דקות לפני המשמרת:",
-            reply_markup=self.telegram_client.inline_kb(buttons),
-            parse_mode=ParseMode.HTML
+            self.telegram_client.inline_kb(buttons)
         )
     
     async def _add_reminder(self, query, minutes: int):
         """Add a new reminder."""
-        if minutes not in self.user_reminders["before_shift"]:
-            self.user_reminders["before_shift"].append(minutes)
-            self.user_reminders["before_shift"].sort()
-            self._save_reminders()
+        user_id = query.from_user.id
+        reminders = self._get_reminders(user_id)
+        if minutes not in reminders["before_shift"]:
+            reminders["before_shift"].append(minutes)
+            reminders["before_shift"].sort()
+            self._save_reminders(user_id)
             
-            await query.edit_message_text(
-                f"✅ <b>התראה של {minutes} דקות נוספה</b>",
-                reply_markup=self.telegram_client.inline_kb([
-                    [("🔙 חזרה", "edit_reminders")]
-                ]),
-                parse_mode=ParseMode.HTML
-            )
+            await self._reply(query, self._MSG_ADDED % minutes)
         else:
-            await query.edit_message_text(
-                f"⚠️ התראה של {minutes} דקות כבר קיימת",
-                reply_markup=self.telegram_client.inline_kb([
-                    [("🔙 חזרה", "edit_reminders")]
-                ]),
-                parse_mode=ParseMode.HTML
-            )
+            await self._reply(query, self._MSG_EXISTS % minutes)
     
     async def _show_remove_reminders_menu(self, query):
         """Show menu to remove existing reminders."""
-        if not self.user_reminders["before_shift"]:
-            await query.edit_message_text(
+        user_id = query.from_user.id
+        reminders = self._get_reminders(user_id)
+        if not reminders["before_shift"]:
+            await self._reply(
+                query,
                 f"❌ <b>אין התראות להסרה</b>\n\n"
-                f"אין התראות מוגדרות כרגע.",
-                reply_markup=self.telegram_client.inline_kb([
-                    [("🔙 חזרה", "edit_reminders")]
-                ]),
-                parse_mode=ParseMode.HTML
+                f"אין התראות מוגדרות כרגע."
             )
             return
         
-        buttons = []
-        for minutes in self.user_reminders["before_shift"]:
-            formatted_time = self._format_time(minutes)
-            buttons.append((f"🗑️ הסר: {formatted_time}", f"remove_reminder_{minutes}"))
-        
-        # Group buttons into rows of 2
-        button_rows = [buttons[i:i+2] for i in range(0, len(buttons), 2)]
-        
-        # Convert each row to inline keyboard format
-        keyboard_rows = [self.telegram_client.inline_buttons_row(row) for row in button_rows]
-        
+        # Emit keyboard rows of 2 buttons directly, one row per pair of reminders
+        keyboard_rows = []
+        row = []
+        for minutes in reminders["before_shift"]:
+            row.append((f"🗑️ הסר: {self._format_time(minutes)}", f"remove_reminder_{minutes}"))
+            if len(row) == 2:
+                keyboard_rows.append(self.telegram_client.inline_buttons_row(row))
+                row = []
+        if row:
+            keyboard_rows.append(self.telegram_client.inline_buttons_row(row))
+
         # Back button
         keyboard_rows.append(self.telegram_client.inline_buttons_row([("🔙 חזרה", "edit_reminders")]))
         
-        await query.edit_message_text(
+        await self._reply(
+            query,
             f"🗑️ <b>הסר התראות</b>\n\n"
             f"בחר איזו התראה להסיר:",
-            reply_markup=self.telegram_client.inline_kb(keyboard_rows),
-            parse_mode=ParseMode.HTML
+            self.telegram_client.inline_kb(keyboard_rows)
         )
     
     async def _show_custom_reminder_input(self, query, context: ContextTypes.DEFAULT_TYPE):
@@ -224,7 +282,8 @@ class RemindersHandler:
         # Set waiting_for to indicate custom reminder input mode
         context.user_data['waiting_for'] = 'reminder_custom'
         
-        await query.edit_message_text(
+        await self._reply(
+            query,
             f"⏰ <b>התראה מותאמת אישית</b>\n\n"
             f"הקלד זמן התראה או 'ביטול' כדי לחזור:\n\n"
             f"פורמטים נתמכים:\n"
@@ -235,62 +294,31 @@ class RemindersHandler:
             f"• 30 - 30 דקות לפני\n"
             f"• 2h - 2 שעות לפני\n"
             f"• 3d - 3 ימים לפני\n"
-            f"• ביטול - חזרה לתפריט",
-            reply_markup=self.telegram_client.inline_kb([
-                [("🔙 חזרה", "edit_reminders")]
-            ]),
-            parse_mode=ParseMode.HTML
+            f"• ביטול - חזרה לתפריט"
         )
     
-    async def _remove_reminder(self, query, minutes: int):
-        """Remove a specific reminder."""
-        if minutes in self.user_reminders["before_shift"]:
-            self.user_reminders["before_shift"].remove(minutes)
-            self._save_reminders()
-            
-            formatted_time = self._format_time(minutes)
-            await query.edit_message_text(
-                f"✅ <b>התראה של {formatted_time} הוסרה</b>",
-                reply_markup=self.telegram_client.inline_kb([
-                    [("🔙 חזרה", "edit_reminders")]
-                ]),
-                parse_mode=ParseMode.HTML
-            )
-        else:
-            formatted_time = self._format_time(minutes)
-            await query.edit_message_text(
-                f"❌ התראה של {formatted_time} לא נמצאה",
-                reply_markup=self.telegram_client.inline_kb([
-                    [("🔙 חזרה", "edit_reminders")]
-                ]),
-                parse_mode=ParseMode.HTML
-            )
-    
     async def _reset_reminders(self, query):
         """Reset reminders to defaults."""
-        import copy
-        self.user_reminders = copy.deepcopy(self.default_reminders)
-        logging.getLogger(__name__).debug("Resetting reminders to: %s", self.user_reminders)
-        self._save_reminders()
+        user_id = query.from_user.id
+        reminders = self._reset_user(user_id)
+        logger.debug("Resetting reminders to: %s", reminders)
+        self._save_reminders(user_id)
         
-        formatted_defaults = [self._format_time(m) for m in self.default_reminders["before_shift"]]
+        formatted_defaults = [self._format_time(m) for m in reversed(self._DEFAULT_BEFORE_SHIFT)]
         defaults_list = ", ".join(formatted_defaults)
         
-        await query.edit_message_text(
+        await self._reply(
+            query,
             f"↩️ <b>התראות אופסו לברירת המחדל</b>\n\n"
-            f"התראות: {defaults_list}",
-            reply_markup=self.telegram_client.inline_kb([
-                [("🔙 חזרה", "edit_reminders")]
-            ]),
-            parse_mode=ParseMode.HTML
+            f"התראות: {defaults_list}"
         )
     
-    async def reset_all_reminders(self, query=None):
+    async def reset_all_reminders(self, query):
         """Reset reminders to defaults without showing message (for reset all)."""
-        import copy
-        self.user_reminders = copy.deepcopy(self.default_reminders)
-        self._save_reminders()
-        logging.getLogger(__name__).debug("Reset all reminders to: %s", self.user_reminders)
+        user_id = query.from_user.id
+        reminders = self._reset_user(user_id)
+        self._save_reminders(user_id)
+        logger.debug("Reset all reminders to: %s", reminders)
     
     async def handle_text_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
         """Handle text input for reminder settings."""
@@ -301,6 +329,7 @@ class RemindersHandler:
         if user_data.get('waiting_for') == 'reminder_custom':
             # Clear the waiting_for
             user_data['waiting_for'] = None
+            user_id = update.effective_user.id
             
             if text == 'ביטול' or text == 'cancel':
                 await update.message.reply_text(
@@ -325,7 +354,8 @@ class RemindersHandler:
                     return True
                 
                 # Check if reminder already exists
-                if minutes in self.user_reminders["before_shift"]:
+                reminders = self._get_reminders(user_id)
+                if minutes in reminders["before_shift"]:
                     formatted_time = self._format_time(minutes)
                     await update.message.reply_text(
                         f"⚠️ <b>התראה כבר קיימת</b>\n\n"
@@ -336,9 +366,9 @@ class RemindersHandler:
                     return True
                 
                 # Add the reminder
-                self.user_reminders["before_shift"].append(minutes)
-                self.user_reminders["before_shift"].sort()
-                self._save_reminders()
+                reminders["before_shift"].append(minutes)
+                reminders["before_shift"].sort()
+                self._save_reminders(user_id)
                 
                 formatted_time = self._format_time(minutes)
                 await update.message.reply_text(
@@ -365,29 +395,15 @@ class RemindersHandler:
     
     async def _remove_reminder(self, query, minutes: int):
         """Remove a reminder time."""
-        if minutes in self.user_reminders["before_shift"]:
-            self.user_reminders["before_shift"].remove(minutes)
-            self._save_reminders()
+        user_id = query.from_user.id
+        reminders = self._get_reminders(user_id)
+        if minutes in reminders["before_shift"]:
+            reminders["before_shift"].remove(minutes)
+            self._save_reminders(user_id)
             
-            await query.edit_message_text(
-                f"✅ <b>התראה הוסרה</b>\n\n"
-                f"התראה של {self._format_time(minutes)} לפני המשמרת הוסרה בהצלחה.",
-                reply_markup=self.telegram_client.inline_kb([
-                    [("🔙 חזרה להגדרות התראות", "edit_reminders")]
-                ]),
-                parse_mode=ParseMode.HTML
-            )
+            await self._reply(query, self._MSG_REMOVED % self._format_time(minutes), self._settings_back_kb)
         else:
-            await query.edit_message_text(
-                f"❌ <b>שגיאה</b>\n\n"
-                f"התראה של {minutes} דקות לא נמצאה.",
-                reply_markup=self.telegram_client.inline_kb([
-                    [("🔙 חזרה להגדרות התראות", "edit_reminders")]
-                ]),
-                parse_mode=ParseMode.HTML
-            )
-    
-        return False
+            await self._reply(query, self._MSG_NOT_FOUND % minutes, self._settings_back_kb)
     
     def _parse_time_input(self, text: str) -> int:
         """Parse time input in various formats and return minutes.
@@ -456,11 +472,13 @@ class RemindersHandler:
         else:  # less than 1 hour
             return f"לפני {minutes} דקות"
     
-    def get_reminders_display(self) -> str:
-        """Get formatted reminders display."""
-        if not self.user_reminders["enabled"]:
+    def get_reminders_display(self, user_id: int) -> str:
+        """Get formatted reminders display for a user."""
+        user_reminders = self._get_reminders(user_id)
+        if not user_reminders["enabled"]:
             return "התראות: כבויות"
         
-        formatted_reminders = [self._format_time(m) for m in sorted(self.user_reminders["before_shift"], reverse=True)]
+        # before_shift is kept sorted ascending, so reversing is enough
+        formatted_reminders = [self._format_time(m) for m in reversed(user_reminders["before_shift"])]
         reminders = ", ".join(formatted_reminders)
         return f"התראות: {reminders or 'אין'}"
@@ -3,6 +3,12 @@ Shift Times Handler - Specialized handler for shift time management.
 Handles all shift time related actions and operations.
 """
 
+import asyncio
+import logging
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional
+
 from Config.shift_times import shift_time_manager
 from Config.menus import MENU_CONFIGS
 from telegram import Update
@@ -10,152 +16,172 @@ from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 
 
+logger = logging.getLogger(__name__)
+
+# Static message heads; the current shift times display is appended
+_RESET_PREFIX = "↩️ <b>זמני משמרות אופסו</b>\n\nכל זמני המשמרות חזרו לברירת המחדל:\n\n"
+_SAVED_PREFIX = "✅ <b>נשמר בהצלחה!</b>\n\nזמני המשמרת עודכנו:\n"
+
+# Start/end prompts, rendered straight from a shift config dict
+_EDIT_START_TMPL = (
+    "⏰ <b>עריכת שעת התחלה - {name}</b>\n\n"
+    "שעת התחלה נוכחית: {start}\n\n"
+    "שלח שעת התחלה החדשה בפורמט HH:MM\n"
+    "לדוגמה: 08:00"
+).format_map
+_EDIT_END_TMPL = (
+    "⏰ <b>עריכת שעת סיום - {name}</b>\n\n"
+    "שעת סיום נוכחית: {end}\n\n"
+    "שלח שעת סיום החדשה בפורמט HH:MM\n"
+    "לדוגמה: 16:00"
+).format_map
+
+
+def _hm_to_min(time_str: str) -> int:
+    """Convert an HH:MM string to minutes since midnight."""
+    return int(time_str[:2]) * 60 + int(time_str[3:5])
+
+
+@dataclass(slots=True)
+class _PendingShift:
+    """Unsaved start/end edits for one shift (None = unchanged)."""
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+
 class ShiftTimesHandler:
     """Handles all shift time related operations and actions."""
     
     def __init__(self, telegram_client):
         self.telegram_client = telegram_client
         self.shift_manager = shift_time_manager
-    
-    async def can_handle(self, data: str) -> bool:
-        """Check if this handler can process the given callback data."""
-        shift_time_actions = [
-            "edit_shift_times", "edit_morning_shift", "edit_noon_shift", 
-            "edit_evening_shift", "reset_shift_times"
-        ]
         
-        return (
-            data in shift_time_actions or
-            data.startswith(("edit_times_", "edit_start_", "edit_end_", "save_shift_", "cancel_edit_"))
+        # The shift times menu keyboard is static; only its title is dynamic
+        self._shift_times_menu_kb = telegram_client.inline_kb(MENU_CONFIGS["edit_shift_times"]["buttons"])
+        
+        # Callback routing: exact matches first, then "<prefix><shift_type>"
+        self._exact = {
+            "edit_shift_times": self._show_shift_times_menu,
+            "reset_shift_times": self._handle_reset_all_times,
+        }
+        for shift_type in self.shift_manager.default_times:
+            self._exact[f"edit_{shift_type}_shift"] = partial(self._show_combined_shift_editor, shift_type=shift_type)
+        self._prefix = (
+            ("edit_times_", self._show_combined_shift_editor),
+            ("edit_start_", self._handle_edit_start_time),
+            ("edit_end_", self._handle_edit_end_time),
+            ("save_shift_", self._handle_save_shift),
+            ("cancel_edit_", self._handle_cancel_edit),
         )
+        # Public routing tables, merged by PreferencesHandler into its dispatch table
+        self.EXACT_CALLBACKS = frozenset(self._exact)
+        self.CALLBACK_PREFIXES = tuple(prefix for prefix, _ in self._prefix)
+        
+        # Keyboards whose buttons never change
+        kb = telegram_client.inline_kb
+        self._reset_kb = {
+            "edit_shift_times": kb([[("🔙 חזרה לעריכת זמנים", "edit_shift_times")]]),
+            "preferences_menu": kb([[("🔙 חזרה להעדפות", "preferences_menu")]]),
+        }
+        self._cancel_kb = {}
+        self._saved_kb = {}
+        self._no_changes_kb = {}
+        self._confirm_kb = {}
+        self._editor_kb = {}
+        self._save_failed_kb = {}
+        self._invalid_time_kb = {}
+        for st in self.shift_manager.default_times:
+            self._invalid_time_kb[st] = kb([[("🔄 נסה שוב", f"edit_times_{st}"), ("❌ ביטול", f"cancel_edit_{st}")]])
+            self._editor_kb[st] = kb([
+                [("⏰ ערוך התחלה", f"edit_start_{st}"), ("⏰ ערוך סיום", f"edit_end_{st}")],
+                [("💾 שמור שינויים", f"save_shift_{st}"), ("❌ בטל", f"cancel_edit_{st}")],
+                [("🔙 חזרה לכל המשמרות", "edit_shift_times")]
+            ])
+            self._save_failed_kb[st] = kb([[("🔄 נסה שוב", f"edit_times_{st}"), ("❌ בטל", f"cancel_edit_{st}")]])
+            self._cancel_kb[st] = kb([[("❌ ביטול", f"edit_{st}_shift")]])
+            self._saved_kb[st] = kb([[("🔄 ערוך שוב", f"edit_times_{st}"), ("🔙 חזרה לכל המשמרות", "edit_shift_times")]])
+            self._no_changes_kb[st] = kb([[("🔙 חזרה", f"edit_{st}_shift")]])
+            self._confirm_kb[st] = kb([
+                [("💾 שמור", f"save_shift_{st}"), ("✏️ המשך עריכה", f"edit_{st}_shift")],
+                [("❌ בטל", f"cancel_edit_{st}")]
+            ])
+    
+    def _route(self, data: str):
+        """Resolve callback data to (handler, shift_type), or None if not ours.
+        
+        shift_type is None for exact-match handlers, which take no shift argument.
+        """
+        handler = self._exact.get(data)
+        if handler is not None:
+            return handler, None
+        for prefix, handler in self._prefix:
+            if data.startswith(prefix):
+                return handler, data[len(prefix):]
+        return None
+    
+    def can_handle(self, data: str) -> bool:
+        """Check if this handler can process the given callback data."""
+        return self._route(data) is not None
     
     async def handle_callback(self, query, data: str, context: ContextTypes.DEFAULT_TYPE) -> bool:
         """Handle shift time callback actions."""
+        route = self._route(data)
+        if route is None:
+            return False  # Action not handled by this handler
         
-        # Main shift time editing menu
-        if data == "edit_shift_times":
-            await self._show_shift_times_menu(query)
-            return True
-        
-        # Individual shift editing menus
-        elif data in ["edit_morning_shift", "edit_noon_shift", "edit_evening_shift"]:
-            shift_type = data.replace("edit_", "").replace("_shift", "")
-            await self._show_combined_shift_editor(query, shift_type, context)
-            return True
-        
-        # Edit specific time components
-        elif data.startswith("edit_times_"):
-            shift_type = data.replace("edit_times_", "")
-            await self._show_combined_shift_editor(query, shift_type, context)
-            return True
-        
-        elif data.startswith("edit_start_"):
-            shift_type = data.replace("edit_start_", "")
-            await self._handle_edit_start_time(query, shift_type, context)
-            return True
-        
-        elif data.startswith("edit_end_"):
-            shift_type = data.replace("edit_end_", "")
-            await self._handle_edit_end_time(query, shift_type, context)
-            return True
-        
-        # Save/Cancel actions
-        elif data.startswith("save_shift_"):
-            shift_type = data.replace("save_shift_", "")
-            await self._handle_save_shift(query, shift_type, context)
-            return True
-        
-        elif data.startswith("cancel_edit_"):
-            shift_type = data.replace("cancel_edit_", "")
-            await self._handle_cancel_edit(query, shift_type, context)
-            return True
-        
-        # Reset all shift times
-        elif data == "reset_shift_times":
-            await self._handle_reset_all_times(query)
-            return True
-        
-        return False  # Action not handled by this handler
+        handler, shift_type = route
+        if shift_type is None:
+            await handler(query, context=context)
+        else:
+            await handler(query, shift_type, context)
+        return True
     
     async def handle_text_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
         """Handle text input for shift time editing."""
         
+        # Shift time prompts store waiting_for as a (field, shift_type) tuple
         waiting_for = context.user_data.get('waiting_for')
-        
-        if not waiting_for or not waiting_for.startswith(('start_time_', 'end_time_')):
+        if not isinstance(waiting_for, tuple):
             return False
+        field, shift_type = waiting_for
 
         time_input = update.message.text.strip()
         
         # Validate time format
         if not self._validate_time_format(time_input):
-            # Extract shift type from waiting_for
-            if waiting_for.startswith('start_time_'):
-                shift_type = waiting_for.replace('start_time_', '')
-            else:
-                shift_type = waiting_for.replace('end_time_', '')
-                
             await update.message.reply_text(
                 "❌ פורמט שעה לא תקין!\n\n"
                 "השתמש בפורמט HH:MM (לדוגמה: 08:30)",
-                reply_markup=self.telegram_client.inline_kb([
-                    self.telegram_client.inline_buttons_row([
-                        ("🔄 נסה שוב", f"edit_times_{shift_type}"),
-                        ("❌ ביטול", f"cancel_edit_{shift_type}")
-                    ])
-                ])
+                reply_markup=self._invalid_time_kb[shift_type]
             )
             return True
-
-        # Parse the waiting action
-        if waiting_for.startswith('start_time_'):
-            shift_type = waiting_for.replace('start_time_', '')
-            field = 'start'
-        else:  # end_time_
-            shift_type = waiting_for.replace('end_time_', '')
-            field = 'end'
-        
-        # Store pending change
-        if 'pending_shift_changes' not in context.user_data:
-            context.user_data['pending_shift_changes'] = {}
-        if shift_type not in context.user_data['pending_shift_changes']:
-            context.user_data['pending_shift_changes'][shift_type] = {}
         
-        context.user_data['pending_shift_changes'][shift_type][field] = time_input
+        # Store pending change (containers are only created for valid input)
+        pending = context.user_data.setdefault('pending_shift_changes', {}).setdefault(shift_type, _PendingShift())
+        setattr(pending, field, time_input)
         
         # Clear waiting state
-        del context.user_data['waiting_for']
+        context.user_data.pop('waiting_for', None)
         
         # Show updated combined editor instead of confirmation
         await self._show_combined_shift_editor_via_message(update, shift_type, context)
         return True
     
-    async def _show_combined_shift_editor_via_message(self, update: Update, shift_type: str, context: ContextTypes.DEFAULT_TYPE):
-        """Show combined editor via message (for text input responses)."""
-        current_times = self.shift_manager.user_times
-        shift_config = current_times[shift_type]
+    def _build_combined_editor(self, shift_type: str, context: ContextTypes.DEFAULT_TYPE):
+        """Build the combined start/end editor text and keyboard, showing pending edits."""
+        shift_config = self.shift_manager.user_times[shift_type]
         
         # Get pending changes if any
-        pending_changes = context.user_data.get('pending_shift_changes', {}).get(shift_type, {})
-        current_start = pending_changes.get('start', shift_config['start'])
-        current_end = pending_changes.get('end', shift_config['end'])
+        pending = context.user_data.get('pending_shift_changes', {}).get(shift_type) or _PendingShift()
+        current_start = pending.start or shift_config['start']
+        current_end = pending.end or shift_config['end']
         
         # Calculate duration based on current/pending times
-        start_time = current_start
-        end_time = current_end
-        
-        try:
-            from datetime import datetime
-            start_dt = datetime.strptime(start_time, "%H:%M")
-            end_dt = datetime.strptime(end_time, "%H:%M")
-            
-            # Handle overnight shifts
-            if end_dt < start_dt:
-                end_dt = end_dt.replace(day=end_dt.day + 1)
-            
-            duration_hours = (end_dt - start_dt).total_seconds() / 3600
-            duration_text = f"{duration_hours:.1f} שעות"
-        except:
+        if self._validate_time_format(current_start) and self._validate_time_format(current_end):
+            # Modulo a day handles overnight shifts
+            duration_minutes = (_hm_to_min(current_end) - _hm_to_min(current_start)) % 1440
+            duration_text = f"{duration_minutes / 60:.1f} שעות"
+        else:
             duration_text = "לא זמין"
         
         editor_text = (
@@ -167,27 +193,14 @@ class ShiftTimesHandler:
             f"בחר מה לערוך:"
         )
         
-        buttons = [
-            self.telegram_client.inline_buttons_row([
-                ("⏰ ערוך התחלה", f"edit_start_{shift_type}"),
-                ("⏰ ערוך סיום", f"edit_end_{shift_type}")
-            ]),
-            self.telegram_client.inline_buttons_row([
-                ("💾 שמור שינויים", f"save_shift_{shift_type}"),
-                ("❌ בטל", f"cancel_edit_{shift_type}")
-            ]),
-            self.telegram_client.inline_buttons_row([
-                ("🔙 חזרה לכל המשמרות", "edit_shift_times")
-            ])
-        ]
-        
-        await update.message.reply_text(
-            editor_text,
-            reply_markup=self.telegram_client.inline_kb(buttons),
-            parse_mode=ParseMode.HTML
-        )
+        return editor_text, self._editor_kb[shift_type]
     
-    async def _show_shift_times_menu(self, query):
+    async def _show_combined_shift_editor_via_message(self, update: Update, shift_type: str, context: ContextTypes.DEFAULT_TYPE):
+        """Show combined editor via message (for text input responses)."""
+        text, kb = self._build_combined_editor(shift_type, context)
+        await update.message.reply_text(text, reply_markup=kb, parse_mode=ParseMode.HTML)
+    
+    async def _show_shift_times_menu(self, query, context=None):
         """Show the main shift times editing menu."""
         menu_config = MENU_CONFIGS["edit_shift_times"]
         
@@ -196,140 +209,59 @@ class ShiftTimesHandler:
             shift_times_display=self.shift_manager.get_shift_times_display()
         )
         
-        # Build proper keyboard
-        button_rows = []
-        for row in menu_config["buttons"]:
-            button_row = self.telegram_client.inline_buttons_row(row)
-            button_rows.append(button_row)
-        
         await query.edit_message_text(
             formatted_title,
-            reply_markup=self.telegram_client.inline_kb(button_rows),
+            reply_markup=self._shift_times_menu_kb,
             parse_mode=ParseMode.HTML
         )
     
     async def _show_combined_shift_editor(self, query, shift_type: str, context: ContextTypes.DEFAULT_TYPE):
         """Show combined editor for both start and end times."""
-        current_times = self.shift_manager.user_times
-        shift_config = current_times[shift_type]
-        
-        # Get pending changes if any
-        pending_changes = context.user_data.get('pending_shift_changes', {}).get(shift_type, {})
-        current_start = pending_changes.get('start', shift_config['start'])
-        current_end = pending_changes.get('end', shift_config['end'])
-        
-        # Calculate duration based on current/pending times
-        start_time = current_start
-        end_time = current_end
-        
-        try:
-            from datetime import datetime
-            start_dt = datetime.strptime(start_time, "%H:%M")
-            end_dt = datetime.strptime(end_time, "%H:%M")
-            
-            # Handle overnight shifts
-            if end_dt < start_dt:
-                end_dt = end_dt.replace(day=end_dt.day + 1)
-            
-            duration_hours = (end_dt - start_dt).total_seconds() / 3600
-            duration_text = f"{duration_hours:.1f} שעות"
-        except:
-            duration_text = "לא זמין"
-        
-        editor_text = (
-            f"⏰ <b>עריכת משמרת {shift_config['name']}</b>\n\n"
-            f"{shift_config['emoji']} <b>זמני נוכחיים:</b>\n"
-            f"• התחלה: {current_start}\n"
-            f"• סיום: {current_end}\n"
-            f"• משך: {duration_text}\n\n"
-            f"בחר מה לערוך:"
-        )
-        
-        buttons = [
-            self.telegram_client.inline_buttons_row([
-                ("⏰ ערוך התחלה", f"edit_start_{shift_type}"),
-                ("⏰ ערוך סיום", f"edit_end_{shift_type}")
-            ]),
-            self.telegram_client.inline_buttons_row([
-                ("💾 שמור שינויים", f"save_shift_{shift_type}"),
-                ("❌ בטל", f"cancel_edit_{shift_type}")
-            ]),
-            self.telegram_client.inline_buttons_row([
-                ("🔙 חזרה לכל המשמרות", "edit_shift_times")
-            ])
-        ]
-        
-        await query.edit_message_text(
-            editor_text,
-            reply_markup=self.telegram_client.inline_kb(buttons),
-            parse_mode=ParseMode.HTML
-        )
+        text, kb = self._build_combined_editor(shift_type, context)
+        await query.edit_message_text(text, reply_markup=kb, parse_mode=ParseMode.HTML)
     
     async def _handle_edit_start_time(self, query, shift_type: str, context: ContextTypes.DEFAULT_TYPE):
         """Handle editing start time for a shift."""
-        current_times = self.shift_manager.user_times
-        current_start = current_times[shift_type]["start"]
-        
         await query.edit_message_text(
-            f"⏰ <b>עריכת שעת התחלה - {current_times[shift_type]['name']}</b>\n\n"
-            f"שעת התחלה נוכחית: {current_start}\n\n"
-            f"שלח שעת התחלה החדשה בפורמט HH:MM\n"
-            f"לדוגמה: 08:00",
-            reply_markup=self.telegram_client.inline_kb([
-                self.telegram_client.inline_buttons_row([("❌ ביטול", f"edit_{shift_type}_shift")])
-            ]),
+            _EDIT_START_TMPL(self.shift_manager.user_times[shift_type]),
+            reply_markup=self._cancel_kb[shift_type],
             parse_mode=ParseMode.HTML
         )
         
         # Store the action in context for the next message
-        context.user_data['waiting_for'] = f'start_time_{shift_type}'
+        context.user_data['waiting_for'] = ('start', shift_type)
     
     async def _handle_edit_end_time(self, query, shift_type: str, context: ContextTypes.DEFAULT_TYPE):
         """Handle editing end time for a shift."""
-        current_times = self.shift_manager.user_times
-        current_end = current_times[shift_type]["end"]
-        
         await query.edit_message_text(
-            f"⏰ <b>עריכת שעת סיום - {current_times[shift_type]['name']}</b>\n\n"
-            f"שעת סיום נוכחית: {current_end}\n\n"
-            f"שלח שעת סיום החדשה בפורמט HH:MM\n"
-            f"לדוגמה: 16:00",
-            reply_markup=self.telegram_client.inline_kb([
-                self.telegram_client.inline_buttons_row([("❌ ביטול", f"edit_{shift_type}_shift")])
-            ]),
+            _EDIT_END_TMPL(self.shift_manager.user_times[shift_type]),
+            reply_markup=self._cancel_kb[shift_type],
             parse_mode=ParseMode.HTML
         )
         
         # Store the action in context for the next message
-        context.user_data['waiting_for'] = f'end_time_{shift_type}'
+        context.user_data['waiting_for'] = ('end', shift_type)
     
     async def _handle_save_shift(self, query, shift_type: str, context: ContextTypes.DEFAULT_TYPE):
         """Save the current shift configuration."""
         pending_changes = context.user_data.get('pending_shift_changes', {})
+        changes = pending_changes.get(shift_type)
         
-        if shift_type in pending_changes:
-            changes = pending_changes[shift_type]
-            success = self.shift_manager.update_shift_time(
+        if changes is not None:
+            # update_shift_time persists to disk; keep that off the event loop
+            success = await asyncio.to_thread(
+                self.shift_manager.update_shift_time,
                 shift_type,
-                changes.get('start'),
-                changes.get('end')
+                changes.start,
+                changes.end
             )
             
             if success:
-                # Clear pending changes
-                if shift_type in pending_changes:
-                    del pending_changes[shift_type]
-                
+                # Keep the edits on failure so "try again" still has them
+                pending_changes.pop(shift_type, None)
                 await query.edit_message_text(
-                    f"✅ <b>נשמר בהצלחה!</b>\n\n"
-                    f"זמני המשמרת עודכנו:\n"
-                    f"{self.shift_manager.get_shift_times_display()}",
-                    reply_markup=self.telegram_client.inline_kb([
-                        self.telegram_client.inline_buttons_row([
-                            ("🔄 ערוך שוב", f"edit_times_{shift_type}"),
-                            ("🔙 חזרה לכל המשמרות", "edit_shift_times")
-                        ])
-                    ]),
+                    _SAVED_PREFIX + self.shift_manager.get_shift_times_display(),
+                    reply_markup=self._saved_kb[shift_type],
                     parse_mode=ParseMode.HTML
                 )
             else:
@@ -337,92 +269,73 @@ class ShiftTimesHandler:
                     f"❌ <b>שגיאה בשמירה</b>\n\n"
                     f"לא הצלחתי לשמור את השינויים.\n"
                     f"נסה שוב.",
-                    reply_markup=self.telegram_client.inline_kb([
-                        self.telegram_client.inline_buttons_row([
-                            ("🔄 נסה שוב", f"edit_times_{shift_type}"),
-                            ("❌ בטל", f"cancel_edit_{shift_type}")
-                        ])
-                    ]),
+                    reply_markup=self._save_failed_kb[shift_type],
                     parse_mode=ParseMode.HTML
                 )
-            
-            # Clear pending changes
-            if shift_type in pending_changes:
-                del pending_changes[shift_type]
         else:
             await query.edit_message_text(
                 f"ℹ️ אין שינויים לשמירה.",
-                reply_markup=self.telegram_client.inline_kb([
-                    [("🔙 חזרה", f"edit_{shift_type}_shift")]
-                ]),
+                reply_markup=self._no_changes_kb[shift_type],
                 parse_mode=ParseMode.HTML
             )
     
-    async def _handle_cancel_edit(self, query, shift_type: str, context: ContextTypes.DEFAULT_TYPE = None):
+    async def _handle_cancel_edit(self, query, shift_type: str, context: ContextTypes.DEFAULT_TYPE):
         """Cancel editing and clear pending changes."""
         # Clear any pending changes for this shift
-        pending_changes = context.user_data.get('pending_shift_changes', {}) if context else {}
-        if shift_type in pending_changes:
-            del pending_changes[shift_type]
+        context.user_data.get('pending_shift_changes', {}).pop(shift_type, None)
         
-        await self._show_combined_shift_editor(query, shift_type, context or {})
+        await self._show_combined_shift_editor(query, shift_type, context)
     
-    async def _handle_reset_all_times(self, query):
+    async def _handle_reset_all_times(self, query, context=None):
         """Reset all shift times to defaults."""
-        self.shift_manager.reset_shift_times()
+        await self._send_reset(query, "edit_shift_times")
+    
+    async def _send_reset(self, query, back: str):
+        """Reset all shift times and show the defaults with a back button to `back`."""
+        await asyncio.to_thread(self.shift_manager.reset_shift_times)
         
         await query.edit_message_text(
-            f"↩️ <b>זמני משמרות אופסו</b>\n\n"
-            f"כל זמני המשמרות חזרו לברירת המחדל:\n\n"
-            f"{self.shift_manager.get_shift_times_display()}",
-            reply_markup=self.telegram_client.inline_kb([
-                self.telegram_client.inline_buttons_row([("🔙 חזרה לעריכת זמנים", "edit_shift_times")])
-            ]),
+            _RESET_PREFIX + self.shift_manager.get_shift_times_display(),
+            reply_markup=self._reset_kb[back],
             parse_mode=ParseMode.HTML
         )
     
     async def _show_time_confirmation(self, update: Update, shift_type: str, context: ContextTypes.DEFAULT_TYPE):
         """Show confirmation after time input."""
         
-        current_times = self.shift_manager.user_times
+        shift = self.shift_manager.user_times[shift_type]
         pending = context.user_data['pending_shift_changes'][shift_type]
         
-        new_start = pending.get('start', current_times[shift_type]['start'])
-        new_end = pending.get('end', current_times[shift_type]['end'])
+        new_start = pending.start or shift['start']
+        new_end = pending.end or shift['end']
         
         confirmation_text = (
             f"✅ <b>זמן עודכן</b>\n\n"
-            f"משמרת {current_times[shift_type]['name']}:\n"
-            f"{current_times[shift_type]['emoji']} {new_start}-{new_end}\n\n"
+            f"משמרת {shift['name']}:\n"
+            f"{shift['emoji']} {new_start}-{new_end}\n\n"
             f"שמור את השינויים או המשך לערוך:"
         )
         
         try:
             await update.message.reply_text(
                 confirmation_text,
-                reply_markup=self.telegram_client.inline_kb([
-                    self.telegram_client.inline_buttons_row([
-                        ("💾 שמור", f"save_shift_{shift_type}"),
-                        ("✏️ המשך עריכה", f"edit_{shift_type}_shift")
-                    ]),
-                    self.telegram_client.inline_buttons_row([("❌ בטל", f"cancel_edit_{shift_type}")])
-                ]),
+                reply_markup=self._confirm_kb[shift_type],
                 parse_mode=ParseMode.HTML
             )
-        except Exception as e:
-            import logging
-            logging.getLogger(__name__).exception("Error sending confirmation: %s", e)
+        except Exception:
+            logger.exception("Error sending confirmation for shift_type=%s", shift_type)
             # Try a simple fallback message
             await update.message.reply_text(f"Time updated to {new_start}-{new_end}")
     
-    def _validate_time_format(self, time_str: str) -> bool:
-        """Validate time format (HH:MM)."""
-        try:
-            from datetime import datetime
-            datetime.strptime(time_str, "%H:%M")
-            return True
-        except ValueError:
+    @staticmethod
+    def _validate_time_format(time_str: str) -> bool:
+        """Validate time format (strict, zero-padded 24h HH:MM)."""
+        if len(time_str) != 5 or time_str[2] != ':':
             return False
+        h1, h2, _, m1, m2 = time_str
+        if not ('0' <= h1 <= '2' and '0' <= h2 <= '9' and '0' <= m1 <= '5' and '0' <= m2 <= '9'):
+            return False
+        return h1 != '2' or h2 <= '3'
     
     def get_shift_times_display(self) -> str:
         """Get formatted shift times display."""
@@ -436,19 +349,15 @@ class ShiftTimesHandler:
         """Check if time falls within a shift."""
         return self.shift_manager.is_time_in_shift(time_str, shift_type)
     
-    async def reset_all_shift_times(self, query):
-        """Reset all shift times to defaults - used by PreferencesHandler."""
-        self.shift_manager.reset_shift_times()
-        
-        await query.edit_message_text(
-            f"↩️ <b>זמני משמרות אופסו</b>\n\n"
-            f"כל זמני המשמרות חזרו לברירת המחדל:\n\n"
-            f"{self.shift_manager.get_shift_times_display()}",
-            reply_markup=self.telegram_client.inline_kb([
-                self.telegram_client.inline_buttons_row([("🔙 חזרה להעדפות", "preferences_menu")])
-            ]),
-            parse_mode=ParseMode.HTML
-        )
+    async def reset_all_shift_times(self, query, quiet: bool = False):
+        """Reset all shift times to defaults - used by PreferencesHandler.
+        
+        With quiet=True the message is left alone so the caller can show its own.
+        """
+        if quiet:
+            await asyncio.to_thread(self.shift_manager.reset_shift_times)
+            return
+        await self._send_reset(query, "preferences_menu")
     
     def get_shift_times_summary(self) -> str:
         """Get a formatted summary of current shift times."""
@@ -7,14 +7,50 @@ from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 from datetime import datetime
-from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
+from zoneinfo import ZoneInfo, available_timezones
 import logging
-from utils import atomic_read_json, atomic_write_json
+import time
+from functools import lru_cache
+from utils import atomic_read_json
+from .PreferencesStore import preferences_store
 
 
+logger = logging.getLogger(__name__)
+
+
+# The tz database doesn't change while the bot runs; sort it once for paging
+_ALL_TIMEZONES = tuple(sorted(available_timezones()))
+_ALL_TIMEZONES_SET = frozenset(_ALL_TIMEZONES)
+_PER_PAGE = 8
+_TOTAL_PAGES = (len(_ALL_TIMEZONES) + _PER_PAGE - 1) // _PER_PAGE
+# (tz, callback_data, display_name) for every timezone button
+_TZ_ROWS = tuple(
+    (tz, f"set_timezone_{tz.replace('/', '_')}", tz.replace('_', ' '))
+    for tz in _ALL_TIMEZONES
+)
+# Reverse map from callback_data back to the tz name ('_' is ambiguous, e.g. Buenos_Aires)
+_CB_TO_TZ = {callback_data: tz for tz, callback_data, _ in _TZ_ROWS}
+_PAGES = tuple(_TZ_ROWS[i:i + _PER_PAGE] for i in range(0, len(_TZ_ROWS), _PER_PAGE))
+
+
+@lru_cache(maxsize=None)
+def _get_tz(name: str) -> ZoneInfo:
+    """Return the ZoneInfo for a (validated) timezone name, built once per name."""
+    return ZoneInfo(name)
+
 class TimezoneHandler:
     """Handles timezone-related preferences."""
     
+    # Callback data routed to this handler (merged into PreferencesHandler's dispatch table)
+    EXACT_CALLBACKS = frozenset({
+        "settings_timezone", "edit_timezone", "show_common_timezones",
+        "show_all_timezones", "reset_timezone",
+    })
+    CALLBACK_PREFIXES = ("set_timezone_", "timezone_page_")
+    
+    # Last known on-disk contents per config file, shared by all instances
+    _config_cache: dict = {}
+    
     def __init__(self, telegram_client):
         self.telegram_client = telegram_client
         self.config_file = "user_timezone.json"
@@ -31,89 +67,119 @@ class TimezoneHandler:
             "Asia/Dubai": "דובאי (GST)",
             "Asia/Tokyo": "טוקיו (JST)"
         }
+        
+        # Common timezone buttons as (tz, label, callback_data); only the ✅ mark varies per render
+        self._common_buttons = tuple(
+            (tz, label, f"set_timezone_{tz.replace('/', '_')}")
+            for tz, label in self.common_timezones.items()
+        )
+        self._current_tz = _get_tz(self.user_timezone)
+        # (timezone, monotonic expiry, "HH:MM") for get_current_time
+        self._time_cache = None
+        
+        # Callback routing: exact data -> handler(query, context),
+        # then prefixed data -> handler(query, data, context)
+        self._exact = {
+            "settings_timezone": self._show_timezone_menu,
+            "edit_timezone": self._show_timezone_menu,
+            "show_common_timezones": self._show_common_timezones,
+            "show_all_timezones": self._open_all_timezones,
+            "reset_timezone": self.reset_timezone,
+        }
+        self._prefixed = (
+            ("set_timezone_", self._on_set_timezone),
+            ("timezone_page_", self._on_timezone_page),
+        )
+        
+        # Rendered "all timezones" page keyboards, keyed by (page, marked timezone)
+        self._page_kb_cache = {}
+        
+        # Static keyboards reused by every response
+        self._menu_kb = telegram_client.inline_kb([
+            [("🌍 אזורי זמן נפוצים", "show_common_timezones"), ("🗺️ כל אזורי הזמן", "show_all_timezones")],
+            [("↩️ איפוס לברירת מחדל", "reset_timezone"), ("🔙 חזרה להעדפות", "preferences_menu")],
+        ])
+        self._back_kb = telegram_client.inline_kb([[("🔙 חזרה", "edit_timezone")]])
+        self._after_set_kb = telegram_client.inline_kb([[("🔙 חזרה להגדרות זמן", "edit_timezone")]])
+    
+    def _set_tz(self, timezone: str):
+        """Set the user's timezone name together with its cached ZoneInfo."""
+        self.user_timezone = timezone
+        self._current_tz = _get_tz(timezone)
     
     def _load_timezone(self):
         """Load user timezone preference."""
-        data = atomic_read_json(self.config_file, default={'timezone': self.default_timezone})
-        return data.get('timezone', self.default_timezone)
+        data = TimezoneHandler._config_cache.get(self.config_file)
+        if data is None:
+            data = atomic_read_json(self.config_file, default={'timezone': self.default_timezone})
+            TimezoneHandler._config_cache[self.config_file] = data
+        timezone = data.get('timezone', self.default_timezone)
+        # An unknown name would make the ZoneInfo lookup in __init__ fail
+        return timezone if timezone in _ALL_TIMEZONES_SET else self.default_timezone
     
     def _save_timezone(self):
-        """Save timezone preference to file."""
-        try:
-            atomic_write_json(self.config_file, {'timezone': self.user_timezone})
-        except Exception:
-            logging.getLogger(__name__).exception("Error saving timezone")
+        """Queue the timezone preference for the next batched write."""
+        data = {'timezone': self.user_timezone}
+        if TimezoneHandler._config_cache.get(self.config_file) == data:
+            return  # Unchanged; skip the write
+        # Cached first so a failed write (even a synchronous one) can drop it again
+        TimezoneHandler._config_cache[self.config_file] = data
+        preferences_store.save(self.config_file, data, on_error=TimezoneHandler._forget_saved)
+    
+    @staticmethod
+    def _forget_saved(path: str, data: dict):
+        """Drop a cached value whose write failed, so the next identical save retries it."""
+        if TimezoneHandler._config_cache.get(path) == data:
+            TimezoneHandler._config_cache.pop(path, None)
     
-    async def can_handle(self, data: str) -> bool:
+    def can_handle(self, data: str) -> bool:
         """Check if this handler can process the given callback data."""
-        return data.startswith("edit_timezone") or data.startswith("set_timezone_") or data.startswith("timezone_page_") or data in [
-            "settings_timezone", "show_common_timezones", "reset_timezone", "show_all_timezones"
-        ]
+        return data in self.EXACT_CALLBACKS or data.startswith(self.CALLBACK_PREFIXES)
     
     async def handle_callback(self, query, data: str, context: ContextTypes.DEFAULT_TYPE) -> bool:
         """Handle timezone callback actions."""
-        logging.getLogger(__name__).debug("TimezoneHandler: Received callback data: %s", data)
-        if data == "settings_timezone":
-            logging.getLogger(__name__).debug("Handling settings_timezone")
-            await self._show_timezone_menu(query, context)
-            return True
-        
-        elif data == "edit_timezone":
-            logging.getLogger(__name__).debug("Handling edit_timezone")
-            await self._show_timezone_menu(query, context)
-            return True
-        
-        elif data == "show_common_timezones":
-            await self._show_common_timezones(query, context)
-            return True
-        
-        elif data == "show_all_timezones":
-            # Reset to first page when opening the menu
-            context.user_data['timezone_page'] = 0
-            await self._show_all_timezones(query, context)
-            return True
-        
-        elif data.startswith("set_timezone_"):
-            timezone = data.replace("set_timezone_", "").replace("_", "/")
-            await self._set_timezone(query, timezone, context)
+        logger.debug("TimezoneHandler: Received callback data: %s", data)
+        handler = self._exact.get(data)
+        if handler is not None:
+            await handler(query, context)
             return True
         
-        elif data.startswith("timezone_page_"):
-            page_num = int(data.replace("timezone_page_", ""))
-            context.user_data['timezone_page'] = page_num
-            await self._show_all_timezones(query, context)
-            return True
+        for prefix, handler in self._prefixed:
+            if data.startswith(prefix):
+                await handler(query, data, context)
+                return True
         
-        elif data == "reset_timezone":
-            await self.reset_timezone(query, context)
-            return True
+        return False
+    
+    async def _open_all_timezones(self, query, context: ContextTypes.DEFAULT_TYPE):
+        """Open the full timezone list on its first page."""
+        context.user_data['timezone_page'] = 0
+        await self._show_all_timezones(query, context)
+    
+    async def _on_timezone_page(self, query, data: str, context: ContextTypes.DEFAULT_TYPE):
+        """Switch the full timezone list to the page in the callback data."""
+        context.user_data['timezone_page'] = int(data.removeprefix("timezone_page_"))
+        await self._show_all_timezones(query, context)
+    
+    async def _on_set_timezone(self, query, data: str, context: ContextTypes.DEFAULT_TYPE):
+        """Set the timezone selected by a set_timezone_ button."""
+        timezone = _CB_TO_TZ.get(data) or data.removeprefix("set_timezone_").replace("_", "/")
+        await self._set_timezone(query, timezone, context)
     
     async def _show_timezone_menu(self, query, context: ContextTypes.DEFAULT_TYPE):
         """Show the timezone configuration menu."""
-        current_tz = ZoneInfo(self.user_timezone)
-        current_time = datetime.now(current_tz).strftime("%H:%M")
+        current_time = self.get_current_time()
         display_name = self.common_timezones.get(self.user_timezone, self.user_timezone)
         
         # Set timezone config mode for text input
         context.user_data['timezone_config_mode'] = True
         
-        buttons = [
-            self.telegram_client.inline_buttons_row([
-                ("🌍 אזורי זמן נפוצים", "show_common_timezones"),
-                ("🗺️ כל אזורי הזמן", "show_all_timezones")
-            ]),
-            self.telegram_client.inline_buttons_row([
-                ("↩️ איפוס לברירת מחדל", "reset_timezone"),
-                ("🔙 חזרה להעדפות", "preferences_menu")
-            ])
-        ]
-        
         await query.edit_message_text(
             f"🕐 <b>הגדרות אזור זמן</b>\n\n"
             f"אזור זמן נוכחי: {display_name}\n"
             f"שעה נוכחית: {current_time}\n\n"
             f"בחר פעולה או <b>הקלד אזור זמן</b> (לדוגמה: America/New_York):",
-            reply_markup=self.telegram_client.inline_kb(buttons),
+            reply_markup=self._menu_kb,
             parse_mode=ParseMode.HTML
         )
     
@@ -122,12 +188,11 @@ class TimezoneHandler:
         # Set timezone config mode for text input
         context.user_data['timezone_config_mode'] = True
         
-        buttons = []
-        
-        for tz, display_name in self.common_timezones.items():
-            current_mark = "✅ " if tz == self.user_timezone else ""
-            callback_data = f"set_timezone_{tz.replace('/', '_')}"
-            buttons.append((f"{current_mark}{display_name}", callback_data))
+        current = self.user_timezone
+        buttons = [
+            (f"✅ {label}" if tz == current else label, callback_data)
+            for tz, label, callback_data in self._common_buttons
+        ]
         
         # Group buttons into rows of 2
         button_rows = [buttons[i:i+2] for i in range(0, len(buttons), 2)]
@@ -151,86 +216,87 @@ class TimezoneHandler:
         context.user_data['timezone_config_mode'] = True
         
         page = context.user_data.get('timezone_page', 0)
-        per_page = 8
         
-        # available_timezones() returns a set of available tz names
-        all_timezones = sorted(available_timezones())
-        start_idx = page * per_page
-        end_idx = start_idx + per_page
-        page_timezones = all_timezones[start_idx:end_idx]
+        await query.edit_message_text(
+            f"🗺️ <b>כל אזורי הזמן</b>\n\n"
+            f"עמוד {page + 1} מתוך {_TOTAL_PAGES}\n"
+            f"בחר אזור זמן או <b>הקלד אזור זמן</b> (לדוגמה: Asia/Tokyo):",
+            reply_markup=self._all_timezones_kb(page),
+            parse_mode=ParseMode.HTML
+        )
+    
+    def _all_timezones_kb(self, page: int):
+        """Return the keyboard for one page of the full timezone list.
         
-        buttons = []
-        for tz in page_timezones:
-            current_mark = "✅ " if tz == self.user_timezone else ""
-            callback_data = f"set_timezone_{tz.replace('/', '_')}"
-            display_name = tz.replace('_', ' ')
-            buttons.append((f"{current_mark}{display_name}", callback_data))
+        Pages are the same for everyone except the ✅ on the current timezone, so markups are
+        cached per (page, marked timezone) and only pages holding the current zone differ.
+        """
+        page_rows = _PAGES[page] if 0 <= page < _TOTAL_PAGES else ()
+        current = self.user_timezone
+        marked = current if any(tz == current for tz, _, _ in page_rows) else None
         
-        # Group buttons into rows of 2
-        button_rows = [buttons[i:i+2] for i in range(0, len(buttons), 2)]
+        key = (page, marked)
+        kb = self._page_kb_cache.get(key)
+        if kb is not None:
+            return kb
         
-        # Convert each row to inline keyboard format
-        keyboard_rows = [self.telegram_client.inline_buttons_row(row) for row in button_rows]
+        buttons = [
+            (f"✅ {display_name}" if tz == marked else display_name, callback_data)
+            for tz, callback_data, display_name in page_rows
+        ]
         
+        # Group buttons into rows of 2
+        keyboard_rows = [buttons[i:i+2] for i in range(0, len(buttons), 2)]
         
         # Navigation buttons
-        if page > 0 or end_idx < len(all_timezones):
-            nav_row = []
-            if page > 0:
-                nav_row.append(("⬅️ הקודם", f"timezone_page_{page-1}"))
-            if end_idx < len(all_timezones):
-                nav_row.append(("הבא ➡️", f"timezone_page_{page+1}"))
-            if nav_row:
-                keyboard_rows.append(self.telegram_client.inline_buttons_row(nav_row))
+        nav_row = []
+        if page > 0:
+            nav_row.append(("⬅️ הקודם", f"timezone_page_{page-1}"))
+        if page + 1 < _TOTAL_PAGES:
+            nav_row.append(("הבא ➡️", f"timezone_page_{page+1}"))
+        if nav_row:
+            keyboard_rows.append(nav_row)
         
         # Back button
-        keyboard_rows.append(self.telegram_client.inline_buttons_row([("🔙 חזרה", "edit_timezone")]))
+        keyboard_rows.append([("🔙 חזרה", "edit_timezone")])
         
-        await query.edit_message_text(
-            f"🗺️ <b>כל אזורי הזמן</b>\n\n"
-            f"עמוד {page + 1} מתוך {(len(all_timezones) + per_page - 1) // per_page}\n"
-            f"בחר אזור זמן או <b>הקלד אזור זמן</b> (לדוגמה: Asia/Tokyo):",
-            reply_markup=self.telegram_client.inline_kb(keyboard_rows),
-            parse_mode=ParseMode.HTML
-        )
+        kb = self.telegram_client.inline_kb(keyboard_rows)
+        if page_rows:  # Don't let out-of-range page numbers grow the cache
+            self._page_kb_cache[key] = kb
+        return kb
     
     async def _set_timezone(self, query, timezone: str, context: ContextTypes.DEFAULT_TYPE):
         """Set the user's timezone."""
-        try:
-            # Validate timezone
-            ZoneInfo(timezone)
-            self.user_timezone = timezone
-            self._save_timezone()
-            
-            # Clear timezone config mode
-            context.user_data['timezone_config_mode'] = False
-            
-            display_name = self.common_timezones.get(timezone, timezone)
-            current_time = datetime.now(ZoneInfo(timezone)).strftime("%H:%M")
-            
-            await query.edit_message_text(
-                f"✅ <b>אזור זמן עודכן</b>\n\n"
-                f"אזור זמן חדש: {display_name}\n"
-                f"שעה נוכחית: {current_time}",
-                reply_markup=self.telegram_client.inline_kb([
-                    [("🔙 חזרה להגדרות זמן", "edit_timezone")]
-                ]),
-                parse_mode=ParseMode.HTML
-            )
-        
-        except ZoneInfoNotFoundError:
+        # Validate timezone
+        if timezone not in _ALL_TIMEZONES_SET:
             await query.edit_message_text(
                 f"❌ <b>אזור זמן לא תקין</b>\n\n"
                 f"אזור הזמן '{timezone}' לא קיים.",
-                reply_markup=self.telegram_client.inline_kb([
-                    [("🔙 חזרה", "edit_timezone")]
-                ]),
+                reply_markup=self._back_kb,
                 parse_mode=ParseMode.HTML
             )
+            return
+        
+        self._set_tz(timezone)
+        self._save_timezone()
+        
+        # Clear timezone config mode
+        context.user_data['timezone_config_mode'] = False
+        
+        display_name = self.common_timezones.get(timezone, timezone)
+        current_time = self.get_current_time()
+        
+        await query.edit_message_text(
+            f"✅ <b>אזור זמן עודכן</b>\n\n"
+            f"אזור זמן חדש: {display_name}\n"
+            f"שעה נוכחית: {current_time}",
+            reply_markup=self._after_set_kb,
+            parse_mode=ParseMode.HTML
+        )
     
     async def reset_timezone(self, query, context: ContextTypes.DEFAULT_TYPE = None):
         """Reset timezone to default."""
-        self.user_timezone = self.default_timezone
+        self._set_tz(self.default_timezone)
         self._save_timezone()
         
         if context:
@@ -242,9 +308,7 @@ class TimezoneHandler:
             await query.edit_message_text(
                 f"↩️ <b>אזור זמן אופס</b>\n\n"
                 f"אזור זמן: {display_name}",
-                reply_markup=self.telegram_client.inline_kb([
-                    [("🔙 חזרה", "edit_timezone")]
-                ]),
+                reply_markup=self._back_kb,
                 parse_mode=ParseMode.HTML
             )
     
@@ -253,9 +317,16 @@ class TimezoneHandler:
         return self.user_timezone
     
     def get_current_time(self) -> str:
-        """Get current time in user's timezone."""
-        tz = ZoneInfo(self.user_timezone)
-        return datetime.now(tz).strftime("%H:%M")
+        """Get current time in user's timezone (HH:MM, cached until the minute changes)."""
+        cached = self._time_cache
+        mono = time.monotonic()
+        if cached is not None and cached[0] == self.user_timezone and mono < cached[1]:
+            return cached[2]
+        
+        now = datetime.now(self._current_tz)
+        text = now.strftime("%H:%M")
+        self._time_cache = (self.user_timezone, mono + 60 - now.second - now.microsecond / 1e6, text)
+        return text
     
     async def handle_text_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
         """Handle text input for timezone settings."""
@@ -264,30 +335,8 @@ class TimezoneHandler:
         
         # Check if user is in timezone configuration mode
         if user_data.get('timezone_config_mode'):
-            try:
-                # Validate timezone
-                ZoneInfo(text)
-
-                # Set the timezone
-                self.user_timezone = text
-                self._save_timezone()
-
-                display_name = self.common_timezones.get(text, text)
-                current_time = datetime.now(ZoneInfo(text)).strftime("%H:%M")
-
-                # Clear the config mode
-                user_data['timezone_config_mode'] = False
-
-                await update.message.reply_text(
-                    f"✅ <b>אזור זמן עודכן</b>\n\n"
-                    f"אזור זמן חדש: {display_name}\n"
-                    f"שעה נוכחית: {current_time}\n\n"
-                    f"הקלד /preferences כדי לחזור להעדפות.",
-                    parse_mode=ParseMode.HTML
-                )
-                return True
-
-            except ZoneInfoNotFoundError:
+            # Validate timezone
+            if text not in _ALL_TIMEZONES_SET:
                 await update.message.reply_text(
                     f"❌ <b>אזור זמן לא תקין</b>\n\n"
                     f"אזור הזמן '{text}' לא קיים.\n\n"
@@ -300,6 +349,25 @@ class TimezoneHandler:
                     parse_mode=ParseMode.HTML
                 )
                 return True
+
+            # Set the timezone
+            self._set_tz(text)
+            self._save_timezone()
+
+            display_name = self.common_timezones.get(text, text)
+            current_time = self.get_current_time()
+
+            # Clear the config mode
+            user_data['timezone_config_mode'] = False
+
+            await update.message.reply_text(
+                f"✅ <b>אזור זמן עודכן</b>\n\n"
+                f"אזור זמן חדש: {display_name}\n"
+                f"שעה נוכחית: {current_time}\n\n"
+                f"הקלד /preferences כדי לחזור להעדפות.",
+                parse_mode=ParseMode.HTML
+            )
+            return True
         
         return False
     
@@ -5,6 +5,7 @@ Handlers:
 - ShiftTimesHandler: Manages shift time configurations
 - RemindersHandler: Manages reminder settings
 - TimezoneHandler: Manages timezone preferences
+- PreferencesStore: Batches preference file writes shared by the handlers
 
 Usage:
     from Handlers.Preferences import ShiftTimesHandler
@@ -14,9 +15,12 @@ Usage:
 from .ShiftTimesHandler import ShiftTimesHandler
 from .RemindersHandler import RemindersHandler
 from .TimezoneHandler import TimezoneHandler
+from .PreferencesStore import PreferencesStore, preferences_store
 
 __all__ = [
     'ShiftTimesHandler',
     'RemindersHandler',
     'TimezoneHandler',
+    'PreferencesStore',
+    'preferences_store',
 ]
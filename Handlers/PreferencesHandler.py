@@ -3,11 +3,32 @@ Preferences Handler - Main orchestrator for all preference-related handlers.
 Coordinates shift times, reminders, and timezone handlers.
 """
 
+import asyncio
 import logging
 from .Preferences import ShiftTimesHandler, RemindersHandler, TimezoneHandler
 from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
+from Config.menus import MENU_CONFIGS
+
+
+logger = logging.getLogger(__name__)
+
+# Main preference navigation handled here rather than by a sub-handler
+_PREF_ACTIONS = frozenset({
+    "settings_shift_times", "settings_reminders",
+    "settings_timezone",
+    "reset_all_preferences",
+})
+# The subset that opens a preference menu
+_NAV_ACTIONS = _PREF_ACTIONS - {"reset_all_preferences"}
+
+# get_preferences_summary layout; only the three section bodies vary
+_SUMMARY_TMPL = (
+    "⏰ **זמני משמרות:**\n{shifts}\n\n"
+    "🔔 **התראות:**\n{reminders}\n\n"
+    "🌍 **אזור זמן:**\n{timezone}"
+)
 
 
 class PreferencesHandler:
@@ -27,39 +48,47 @@ class PreferencesHandler:
             'reminders': self.reminders_handler,
             'timezone': self.timezone_handler,
         }
-    
-    async def can_handle(self, data: str) -> bool:
-        """Check if any preference handler can process the given callback data."""
         
-        # Check if any sub-handler can handle this data
+        # Callback routing table built from the sub-handlers' declared callbacks:
+        # exact data -> handler, then (prefix, handler) pairs in handler order
+        self._exact = {}
         for handler in self.handlers.values():
-            if await handler.can_handle(data):
-                return True
+            for callback_data in handler.EXACT_CALLBACKS:
+                self._exact.setdefault(callback_data, handler)
+        self._prefixes = tuple(
+            (prefix, handler)
+            for handler in self.handlers.values()
+            for prefix in handler.CALLBACK_PREFIXES
+        )
+        self._all_prefixes = tuple(prefix for prefix, _ in self._prefixes)
         
-        # Also handle main preference navigation
-        preference_actions = [
-            "settings_shift_times", "settings_reminders", 
-            "settings_timezone",
-            "reset_all_preferences"
-        ]
+        # Text input routing for string waiting_for values: (prefix, handler).
+        # Shift time edits store a (field, shift_type) tuple instead and go to shift_times_handler.
+        self._text_routes = (
+            ('reminder_', self.reminders_handler),
+            ('timezone_', self.timezone_handler),
+        )
         
-        return data in preference_actions
+        # Keyboards for static MENU_CONFIGS entries, keyed by callback data
+        self._menu_kb_cache = {}
+        self._back_to_prefs_kb = telegram_client.inline_kb([[("🔙 חזרה להעדפות", "preferences_menu")]])
+    
+    def can_handle(self, data: str) -> bool:
+        """Check if any preference handler can process the given callback data."""
+        return data in self._exact or data.startswith(self._all_prefixes) or data in _PREF_ACTIONS
     
     async def handle_callback(self, query, data: str, context: ContextTypes.DEFAULT_TYPE) -> bool:
         """Route callback to appropriate sub-handler or handle main navigation."""
-        logger = logging.getLogger(__name__)
         logger.debug("PreferencesHandler: Received callback data: %s", data)
         
-        # Try each sub-handler first
-        for handler_name, handler in self.handlers.items():
-            can_handle = await handler.can_handle(data)
-            logger.debug("PreferencesHandler: %s can_handle(%s): %s", handler_name, data, can_handle)
-            if can_handle:
-                logger.debug("PreferencesHandler: Routing to %s", handler_name)
-                return await handler.handle_callback(query, data, context)
+        # Sub-handlers first, via the routing table
+        handler = self._route(data)
+        if handler is not None:
+            logger.debug("PreferencesHandler: Routing %s to %s", data, type(handler).__name__)
+            return await handler.handle_callback(query, data, context)
         
-        # Handle main preference navigation
-        if data.startswith("settings_"):
+        # Handle main preference navigation (only the actions can_handle accepts)
+        if data in _NAV_ACTIONS:
             await self._handle_preference_navigation(query, data)
             return True
         
@@ -69,39 +98,45 @@ class PreferencesHandler:
         
         return False  # Couldn't handle this data
     
+    def _route(self, data: str):
+        """Return the sub-handler responsible for the callback data, or None."""
+        handler = self._exact.get(data)
+        if handler is None and data.startswith(self._all_prefixes):
+            handler = next(h for prefix, h in self._prefixes if data.startswith(prefix))
+        return handler
+    
     async def handle_text_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
         """Route text input to appropriate sub-handler."""
+        # Check what the user is waiting for
+        waiting_for = context.user_data.get('waiting_for')
+        if not waiting_for:
+            return False
+        
+        if isinstance(waiting_for, tuple):
+            handler = self.shift_times_handler
+        else:
+            handler = next((h for prefix, h in self._text_routes if waiting_for.startswith(prefix)), None)
+            if handler is None:
+                return False  # No handler could process this input
+        
         try:
-            # Check what the user is waiting for
-            waiting_for = context.user_data.get('waiting_for', '')
-            
-            # Route to shift times handler if relevant
-            if waiting_for.startswith(('start_time_', 'end_time_')):
-                return await self.shift_times_handler.handle_text_input(update, context)
-            
-            # Route to reminders handler if relevant
-            if waiting_for.startswith('reminder_'):
-                return await self.reminders_handler.handle_text_input(update, context)
-            
-            # Route to timezone handler if relevant
-            if waiting_for.startswith('timezone_'):
-                return await self.timezone_handler.handle_text_input(update, context)
-            
-            return False  # No handler could process this input
+            return await handler.handle_text_input(update, context)
         except Exception as e:
-            logging.getLogger(__name__).exception("ERROR in PreferencesHandler.handle_text_input: %s", e)
+            logger.exception("ERROR in PreferencesHandler.handle_text_input: %s", e)
             return False
     
     async def _handle_preference_navigation(self, query, data: str):
         """Handle main preference menu navigation."""
-        from Config.menus import MENU_CONFIGS
-        
         if data in MENU_CONFIGS:
             menu_config = MENU_CONFIGS[data]
             
-            # Handle callable menu configs (like shift edit menus)
+            # Callable menu configs (like shift edit menus) are rebuilt every time;
+            # static ones always produce the same keyboard, so it is cached
+            keyboard = None
             if callable(menu_config):
                 menu_config = menu_config()
+            else:
+                keyboard = self._menu_kb_cache.get(data)
             
             # Format titles with dynamic content
             title = menu_config["title"]
@@ -111,22 +146,27 @@ class PreferencesHandler:
                 )
             elif data == "settings_reminders":
                 title = title.format(
-                    reminders_display=self.reminders_handler.get_reminders_display()
+                    reminders_display=self.reminders_handler.get_reminders_display(query.from_user.id)
                 )
             elif data == "settings_timezone":
                 title = title.format(
                     timezone_display=self.timezone_handler.get_timezone_display()
                 )
             
-            # Build proper keyboard
-            button_rows = []
-            for row in menu_config["buttons"]:
-                button_row = self.telegram_client.inline_buttons_row(row)
-                button_rows.append(button_row)
+            if keyboard is None:
+                keyboard = self.telegram_client.inline_kb(
+                    [self.telegram_client.inline_buttons_row(row) for row in menu_config["buttons"]]
+                )
+                if not callable(MENU_CONFIGS[data]):
+                    self._menu_kb_cache[data] = keyboard
+            
+            # Re-tapping the menu that is already shown would only get "message is not modified"
+            if self._already_shows(query.message, title, keyboard):
+                return
             
             await query.edit_message_text(
                 title,
-                reply_markup=self.telegram_client.inline_kb(button_rows),
+                reply_markup=keyboard,
                 parse_mode=ParseMode.HTML
             )
         else:
@@ -135,12 +175,17 @@ class PreferencesHandler:
                 f"⚙️ <b>העדפות</b>\n\n"
                 f"פעולה: {data}\n"
                 f"(הפעולה הזו עדיין בפיתוח)",
-                reply_markup=self.telegram_client.inline_kb([
-                    self.telegram_client.inline_buttons_row([("🔙 חזרה להעדפות", "preferences_menu")])
-                ]),
+                reply_markup=self._back_to_prefs_kb,
                 parse_mode=ParseMode.HTML
             )
     
+    @staticmethod
+    def _already_shows(message, html: str, keyboard) -> bool:
+        """Return True if the callback's message already has exactly this text and keyboard."""
+        if message is None or getattr(message, "reply_markup", None) != keyboard:
+            return False
+        return getattr(message, "text_html", None) == html
+    
     # Helper methods for future expansion
     
     def get_shift_times_handler(self):
@@ -157,33 +202,25 @@ class PreferencesHandler:
     
     async def reset_all_preferences(self, query):
         """Reset all preferences to defaults."""
-        # Reset all preferences through their handlers
-        await self.shift_times_handler.reset_all_shift_times(query)
-        await self.reminders_handler.reset_all_reminders(query)
-        await self.timezone_handler.reset_timezone(query)
+        # Reset all preferences through their handlers; they are independent, so run them
+        # together and let only this method edit the message
+        await asyncio.gather(
+            self.shift_times_handler.reset_all_shift_times(query, quiet=True),
+            self.reminders_handler.reset_all_reminders(query),
+            self.timezone_handler.reset_timezone(query),
+        )
         
         await query.edit_message_text(
             f"↩️ <b>העדפות אופסו</b>\n\n"
             f"כל ההעדפות חזרו לברירת המחדל.",
-            reply_markup=self.telegram_client.inline_kb([
-                self.telegram_client.inline_buttons_row([("🔙 חזרה להעדפות", "preferences_menu")])
-            ]),
+            reply_markup=self._back_to_prefs_kb,
             parse_mode=ParseMode.HTML
         )
     
-    def get_preferences_summary(self) -> str:
-        """Get a summary of current preferences."""
-        summary_parts = []
-        
-        # Add shift times summary
-        shift_summary = self.shift_times_handler.get_shift_times_summary()
-        summary_parts.append(f"⏰ **זמני משמרות:**\n{shift_summary}")
-        
-        # Add other preference summaries
-        reminders_summary = self.reminders_handler.get_reminders_summary()
-        summary_parts.append(f"🔔 **התראות:**\n{reminders_summary}")
-        
-        timezone_summary = self.timezone_handler.get_timezone_summary()
-        summary_parts.append(f"🌍 **אזור זמן:**\n{timezone_summary}")
-        
-        return "\n\n".join(summary_parts)
+    def get_preferences_summary(self, user_id: int) -> str:
+        """Get a summary of a user's current preferences."""
+        return _SUMMARY_TMPL.format(
+            shifts=self.shift_times_handler.get_shift_times_summary(),
+            reminders=self.reminders_handler.get_reminders_display(user_id),
+            timezone=self.timezone_handler.get_timezone_display(),
+        )
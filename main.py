@@ -4,21 +4,32 @@ Entry point for the Shifts Bot.
 """
 
 import logging
-from Clients.MainClient import MainClient
 
 
-# Configure root logger for the application
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
-)
+def _configure_logging():
+    """Configure the root logger for the application."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+    )
 
-# Silence overly-verbose HTTP libraries and third-party noise
-logging.getLogger('urllib3').setLevel(logging.WARNING)
-logging.getLogger('httpx').setLevel(logging.WARNING)
-logging.getLogger('aiohttp').setLevel(logging.WARNING)
-logging.getLogger('http').setLevel(logging.WARNING)
+    # Silence overly-verbose HTTP libraries and third-party noise
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    logging.getLogger('aiohttp').setLevel(logging.WARNING)
+    logging.getLogger('http').setLevel(logging.WARNING)
+
+
+def main():
+    """Configure logging, then create the bot and start polling."""
+    _configure_logging()
+
+    # Imported after logging is configured so import-time log calls are formatted too
+    from Clients.MainClient import MainClient
 
-if __name__ == "__main__":
     bot = MainClient()
     bot.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+Shared helpers for the test scripts.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def in_temp_dir():
+    """Run the block inside a scratch working directory and yield its path.
+
+    The bot's preference files (user_shift_times.json, user_timezone.json, reminders/) are
+    relative to the working directory, and importing Config.shift_times already creates one,
+    so tests must never run these from the repository root.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test the atomic_read_json cache: returned copies and invalidation on file changes.
+"""
+
+import sys
+import os
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def test_atomic_read_json_cache():
+    """Cached reads must never return stale or shared data."""
+    import logging
+    from utils import atomic_read_json, atomic_write_json
+    logger = logging.getLogger(__name__)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.json")
+
+        # Every call returns an independent copy
+        atomic_write_json(path, {"a": [1, 2]})
+        first = atomic_read_json(path)
+        first["a"].append(3)  # Returned on a cache miss
+        assert atomic_read_json(path) == {"a": [1, 2]}
+        second = atomic_read_json(path)
+        second["a"].append(4)  # Returned on a cache hit
+        assert atomic_read_json(path) == {"a": [1, 2]}
+        assert atomic_read_json(path) is not atomic_read_json(path)
+        logger.info("  Independent copies: ok")
+
+        # An atomic rewrite replaces the inode
+        atomic_write_json(path, {"a": [9]})
+        assert atomic_read_json(path) == {"a": [9]}
+        logger.info("  Atomic rewrite: ok")
+
+        # An in-place rewrite that changes the size
+        with open(path, "w") as f:
+            f.write('{"a": [10, 20]}')
+        assert atomic_read_json(path) == {"a": [10, 20]}
+        logger.info("  In-place rewrite (size): ok")
+
+        # An in-place rewrite of the same size, told apart by mtime only
+        st = os.stat(path)
+        with open(path, "w") as f:
+            f.write('{"a": [30, 40]}')
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert atomic_read_json(path) == {"a": [30, 40]}
+        logger.info("  In-place rewrite (mtime): ok")
+
+        # Deleted file falls back to the default instead of the cached value
+        os.remove(path)
+        assert atomic_read_json(path) is None
+        assert atomic_read_json(path, {}) == {}
+        logger.info("  Deleted file: ok")
+
+        # Invalid JSON returns the default and is not cached
+        with open(path, "w") as f:
+            f.write("{not json")
+        assert atomic_read_json(path, "default") == "default"
+        atomic_write_json(path, [1])
+        assert atomic_read_json(path, "default") == [1]
+        logger.info("  Invalid JSON: ok")
+
+    logger.info("✅ atomic_read_json cache checks passed")
+
+if __name__ == "__main__":
+    import logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    test_atomic_read_json_cache()
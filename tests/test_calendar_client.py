@@ -12,7 +12,27 @@ from utils import to_iso8601
 import traceback
 import json
 
-def test_calendar_client():
+
+def _summarize(ev):
+    """Extract the display fields of an event dict once.
+
+    Returns (id, summary, start, end, description, location, attendees, reminders).
+    """
+    start = ev.get('start', {})
+    end = ev.get('end', {})
+    return (
+        ev.get('id', 'N/A'),
+        ev.get('summary', 'No title'),
+        start.get('dateTime') or start.get('date', 'Unknown'),
+        end.get('dateTime') or end.get('date', 'Unknown'),
+        ev.get('description', ''),
+        ev.get('location', ''),
+        ev.get('attendees') or (),
+        ev.get('reminders') or {},
+    )
+
+
+def run_calendar_client():
     """Test the CalendarClient functionality."""
     import logging
     logger = logging.getLogger(__name__)
@@ -31,29 +51,24 @@ def test_calendar_client():
         if upcoming_events:
             logger.info("📋 Upcoming events (showing up to 5):")
             for i, event in enumerate(upcoming_events[:5]):  # Show first 5 events
-                summary = event.get('summary', 'No title')
-                start = event.get('start', {})
-                end = event.get('end', {})
-                start_time = start.get('dateTime', start.get('date', 'Unknown'))
-                end_time = end.get('dateTime', end.get('date', 'Unknown'))
-                event_id = event.get('id', 'N/A')
-                desc = event.get('description', '')
-                location = event.get('location', '')
-                attendees = event.get('attendees', [])
-                reminders = event.get('reminders', {})
-                logger.info("--- Event %d ---", i+1)
-                logger.info("  ID: %s", event_id)
-                logger.info("  Title: %s", summary)
-                logger.info("  Start: %s", start_time)
-                logger.info("  End: %s", end_time)
+                event_id, summary, start_time, end_time, desc, location, attendees, reminders = _summarize(event)
+                # One log record per event instead of one per field
+                lines = [
+                    f"--- Event {i+1} ---",
+                    f"  ID: {event_id}",
+                    f"  Title: {summary}",
+                    f"  Start: {start_time}",
+                    f"  End: {end_time}",
+                ]
                 if location:
-                    logger.info("  Location: %s", location)
+                    lines.append(f"  Location: {location}")
                 if desc:
-                    logger.info("  Description: %s", desc)
+                    lines.append(f"  Description: {desc}")
                 if attendees:
-                    logger.info("  Attendees: %d", len(attendees))
+                    lines.append(f"  Attendees: {len(attendees)}")
                 if reminders:
-                    logger.info("  Reminders: %s", json.dumps(reminders, ensure_ascii=False))
+                    lines.append(f"  Reminders: {json.dumps(reminders, ensure_ascii=False)}")
+                logger.info("%s", "\n".join(lines))
 
         # Test 2: Check for overlaps (using a future time to avoid conflicts)
         logger.info("\n🔍 Test 2: Checking for overlaps...")
@@ -64,12 +79,11 @@ def test_calendar_client():
         logger.info("✅ Overlap check completed. Conflicts found: %s", has_conflict)
 
         if has_conflict:
-            logger.warning("⚠️  Found %d conflicting events", len(conflicts))
+            lines = [f"⚠️  Found {len(conflicts)} conflicting events"]
             for j, ev in enumerate(conflicts[:5]):
-                s = ev.get('summary', 'No title')
-                st = ev.get('start', {}).get('dateTime', ev.get('start', {}).get('date', 'Unknown'))
-                en = ev.get('end', {}).get('dateTime', ev.get('end', {}).get('date', 'Unknown'))
-                logger.warning("  Conflict %d: %s (%s - %s)", j+1, s, st, en)
+                _, s, st, en, *_ = _summarize(ev)
+                lines.append(f"  Conflict {j+1}: {s} ({st} - {en})")
+            logger.warning("%s", "\n".join(lines))
 
         # Test 3: Create a test event (30 days from now to avoid real conflicts)
         logger.info("\n📝 Test 3: Creating a test event...")
@@ -135,7 +149,7 @@ def main():
         logger.info("❌ Test cancelled by user.")
         return
     
-    success = test_calendar_client()
+    success = run_calendar_client()
     
     logger.info("\n%s", "=" * 60)
     if success:
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test utils.to_iso8601_batch against to_iso8601, including DST transition days.
+"""
+
+import sys
+import os
+from datetime import timedelta, timezone
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (tz, year, month, day) -> a full day is checked for each
+DAYS = [
+    ("America/New_York", 2025, 3, 9),     # Spring forward (02:00 -> 03:00, includes a nonexistent hour)
+    ("America/New_York", 2025, 11, 2),    # Fall back (01:00-02:00 happens twice)
+    ("America/New_York", 2025, 7, 1),     # Ordinary summer day
+    ("Asia/Jerusalem", 2025, 3, 28),      # Spring forward on a Friday
+    ("Asia/Jerusalem", 2025, 10, 26),     # Fall back
+    ("Asia/Kolkata", 2025, 1, 1),         # Half-hour offset
+    ("Australia/Lord_Howe", 2025, 4, 6),  # Half-hour DST shift
+    ("UTC", 2025, 1, 1),
+]
+
+def _day_rows(year, month, day):
+    return [(year, month, day, h, m, s) for h in range(24) for m in (0, 15, 30, 59) for s in (0, 59)]
+
+def test_to_iso8601_batch():
+    """Batch output must match the per-row conversion exactly."""
+    import logging
+    from utils import to_iso8601, to_iso8601_batch
+    logger = logging.getLogger(__name__)
+
+    for tz_name, year, month, day in DAYS:
+        rows = _day_rows(year, month, day)
+        expected = [to_iso8601(*row, tz_name) for row in rows]
+        assert to_iso8601_batch(rows, tz_name) == expected, f"{tz_name} {year}-{month}-{day}"
+        logger.info("  %s %04d-%02d-%02d: ok", tz_name, year, month, day)
+
+    # Rows spanning several days, out of order, through a transition
+    rows = _day_rows(2025, 11, 3) + _day_rows(2025, 11, 2) + _day_rows(2025, 11, 1)
+    assert to_iso8601_batch(rows, "America/New_York") == [to_iso8601(*row, "America/New_York") for row in rows]
+
+    # Ready tzinfo objects, including a fixed offset with seconds
+    for tz in (timezone(timedelta(hours=-3, minutes=-30)), timezone(timedelta(hours=5, seconds=30))):
+        rows = _day_rows(2025, 6, 1)
+        assert to_iso8601_batch(rows, tz) == [to_iso8601(*row, tz) for row in rows], tz
+
+    assert to_iso8601_batch([], "UTC") == []
+
+    logger.info("✅ to_iso8601_batch checks passed")
+
+if __name__ == "__main__":
+    import logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    test_to_iso8601_batch()
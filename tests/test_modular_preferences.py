@@ -29,29 +29,27 @@ def test_preferences_handler():
     
     logger.info("✅ PreferencesHandler initialized successfully")
     
-    # Test handler routing capabilities
-    test_actions = [
-        "settings_shift_times",  # Should route to menu navigation
-        "edit_shift_times",      # Should route to ShiftTimesHandler
-        "edit_morning_shift",    # Should route to ShiftTimesHandler
-        "edit_start_morning",    # Should route to ShiftTimesHandler
-        "some_other_action",     # Should not be handled
-    ]
+    # Test handler routing capabilities: action -> expected can_handle
+    test_actions = {
+        "settings_shift_times": True,   # Should route to menu navigation
+        "edit_shift_times": True,       # Should route to ShiftTimesHandler
+        "edit_morning_shift": True,     # Should route to ShiftTimesHandler
+        "edit_start_morning": True,     # Should route to ShiftTimesHandler
+        "some_other_action": False,     # Should not be handled
+    }
     
     logger.info("\n📋 Testing Action Routing:")
-    for action in test_actions:
-        can_handle = None
-        try:
-            # Note: can_handle is async, so we can't easily test it here without asyncio
-            # This is just to show the structure
-            logger.debug("  %s: Handler found = %s", action, preferences.handlers)
-        except Exception as e:
-            logger.exception("  %s: Error = %s", action, e)
+    for action, expected in test_actions.items():
+        # can_handle is synchronous, so routing can be checked directly
+        can_handle = preferences.can_handle(action)
+        logger.debug("  %s: Handler found = %s", action, can_handle)
+        assert can_handle is expected, f"{action}: can_handle={can_handle}, expected {expected}"
     
     # Test direct handler access
     logger.info("\n🔧 Testing Handler Access:")
     shift_handler = preferences.get_shift_times_handler()
     logger.info("  ShiftTimesHandler: %s", type(shift_handler).__name__)
+    assert shift_handler is preferences.handlers['shift_times']
     
     # Test shift times functionality
     logger.info("  Shift Times Summary: %s", shift_handler.get_shift_times_summary())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test PreferencesStore write coalescing, flushing and the no-event-loop fallback.
+"""
+
+import sys
+import os
+import asyncio
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.helpers import in_temp_dir
+
+def _make_store():
+    """Return a PreferencesStore that records each written batch."""
+    from Handlers.Preferences import PreferencesStore
+
+    class RecordingStore(PreferencesStore):
+        FLUSH_DELAY = 0.05
+
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+
+        def _write_all(self, pending):
+            if pending:
+                self.batches.append(sorted(pending))
+            super()._write_all(pending)
+
+    return RecordingStore()
+
+def test_preferences_store():
+    """Run all PreferencesStore checks inside a scratch directory."""
+    import logging
+    logger = logging.getLogger(__name__)
+
+    with in_temp_dir() as tmp:
+        from utils import atomic_read_json
+
+        # No running event loop: the write happens immediately
+        store = _make_store()
+        path = os.path.join(tmp, "sync", "a.json")
+        store.save(path, {"v": 1})
+        assert atomic_read_json(path) == {"v": 1}
+        logger.info("  Synchronous fallback: ok")
+
+        # Repeated saves within the window are coalesced into one batch
+        store = _make_store()
+        a = os.path.join(tmp, "coalesce", "a.json")
+        b = os.path.join(tmp, "coalesce", "b.json")
+
+        async def coalesce():
+            data = {"v": 1}
+            store.save(a, data)
+            data["v"] = 2  # Saved data is snapshotted, later mutation is not written...
+            store.save(b, {"w": 1})
+            store.save(a, {"v": 3})  # ...and the latest save per path wins
+            assert store.batches == []
+            await asyncio.sleep(store.FLUSH_DELAY * 4)
+
+        asyncio.run(coalesce())
+        assert store.batches == [[a, b]], store.batches
+        assert atomic_read_json(a) == {"v": 3}
+        assert atomic_read_json(b) == {"w": 1}
+        logger.info("  Coalescing: ok")
+
+        # flush() writes pending data right away and cancels the timer
+        store = _make_store()
+        c = os.path.join(tmp, "flush", "c.json")
+
+        async def flush():
+            store.save(c, {"v": 1})
+            store.flush()
+            assert atomic_read_json(c) == {"v": 1}
+            await asyncio.sleep(store.FLUSH_DELAY * 4)
+
+        asyncio.run(flush())
+        assert len(store.batches) == 1, store.batches
+        logger.info("  Flush: ok")
+
+        # An older batch never overwrites a newer one
+        store = _make_store()
+        d = os.path.join(tmp, "order", "d.json")
+        store._write_all({d: (2, {"v": "new"}, None)})
+        store._write_all({d: (1, {"v": "old"}, None)})
+        assert atomic_read_json(d) == {"v": "new"}
+        logger.info("  Stale batch guard: ok")
+
+    logger.info("✅ PreferencesStore checks passed")
+
+if __name__ == "__main__":
+    import logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    test_preferences_store()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test RemindersHandler display ordering and legacy reminders migration.
+"""
+
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.helpers import in_temp_dir
+
+# Mock telegram client for testing
+class MockTelegramClient:
+    def inline_kb(self, buttons):
+        return f"Keyboard with buttons: {buttons}"
+
+# Largest reminder first, as the menus have always shown it
+EXPECTED_DEFAULT_DISPLAY = "התראות: לפני 30 דקות, לפני 15 דקות"
+
+def test_reminders_display_after_reset():
+    """Defaults must display largest-first for new users and after a reset."""
+    import logging
+    logger = logging.getLogger(__name__)
+
+    with in_temp_dir():
+        from Handlers.Preferences import RemindersHandler
+        handler = RemindersHandler(MockTelegramClient())
+
+        # User with neither a shard file nor a legacy file
+        display = handler.get_reminders_display(1)
+        logger.info("  New user: %s", display)
+        assert display == EXPECTED_DEFAULT_DISPLAY, display
+
+        # Same user after custom edits and a reset
+        handler._get_reminders(1)["before_shift"] = [5, 60]
+        handler._reset_user(1)
+        display = handler.get_reminders_display(1)
+        logger.info("  After reset: %s", display)
+        assert display == EXPECTED_DEFAULT_DISPLAY, display
+        assert handler._get_reminders(1)["before_shift"] == sorted(handler._get_reminders(1)["before_shift"])
+
+    logger.info("✅ Reminder display order checks passed")
+
+def test_legacy_reminders_migration():
+    """Only a user's own legacy entry may seed their reminders."""
+    import logging
+    logger = logging.getLogger(__name__)
+
+    with in_temp_dir():
+        from Handlers.Preferences import RemindersHandler
+        from utils import atomic_write_json
+        own = {"before_shift": [60, 5], "enabled": False, "sound_enabled": True}
+
+        # Legacy file keyed by user id
+        atomic_write_json("user_reminders.json", {"1": own})
+        handler = RemindersHandler(MockTelegramClient())
+        assert handler._get_reminders(1) == {**own, "before_shift": [5, 60]}
+        assert handler._get_reminders(2) == handler._fresh_defaults()
+        logger.info("  Keyed legacy entry: ok")
+
+        # Old single-user format has no owner and is not copied to anyone
+        atomic_write_json("user_reminders.json", own)
+        handler = RemindersHandler(MockTelegramClient())
+        assert handler._get_reminders(1) == handler._fresh_defaults()
+        logger.info("  Unkeyed legacy file: ok")
+
+    logger.info("✅ Legacy reminders migration checks passed")
+
+if __name__ == "__main__":
+    import logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    test_reminders_display_after_reset()
+    test_legacy_reminders_migration()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test ShiftTimeManager saves from concurrent worker threads.
+"""
+
+import sys
+import os
+import threading
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.helpers import in_temp_dir
+
+def test_concurrent_saves_keep_latest_state():
+    """Overlapping updates/resets must leave the file and display matching memory."""
+    import logging
+    logger = logging.getLogger(__name__)
+
+    with in_temp_dir() as tmp:
+        from Config.shift_times import ShiftTimeManager
+        from utils import atomic_read_json
+
+        manager = ShiftTimeManager(os.path.join(tmp, "times.json"))
+
+        def edit(i):
+            manager.update_shift_time("morning", start_time=f"{i % 24:02d}:00")
+            manager.get_shift_times_display()
+            if i % 10 == 0:
+                manager.reset_shift_times()
+
+        threads = [threading.Thread(target=edit, args=(i,)) for i in range(50)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        on_disk = atomic_read_json(manager.config_file)
+        logger.info("  Final morning start: %s", manager.user_times["morning"]["start"])
+        assert on_disk == manager.user_times, (on_disk, manager.user_times)
+        assert f"{manager.user_times['morning']['start']}-" in manager.get_shift_times_display()
+
+        # An older snapshot finishing last must not overwrite a newer one
+        with manager._lock:
+            stale = manager._snapshot_locked()
+        manager.update_shift_time("noon", start_time="13:00")
+        manager._write(stale)
+        assert atomic_read_json(manager.config_file)["noon"]["start"] == "13:00"
+
+    logger.info("✅ Concurrent shift time saves checks passed")
+
+if __name__ == "__main__":
+    import logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    test_concurrent_saves_keep_latest_state()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test ShiftTimesHandler time input validation edge cases.
+"""
+
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.helpers import in_temp_dir
+
+# Input -> expected result of _validate_time_format (strict, zero-padded 24h HH:MM)
+TIME_CASES = {
+    "00:00": True,
+    "09:30": True,
+    "23:59": True,
+    "24:00": False,     # Hour out of range
+    "09:60": False,     # Minute out of range
+    "9:30": False,      # Not zero-padded
+    "09:3": False,
+    "0930": False,
+    "09-30": False,
+    "009:30": False,
+    "": False,
+    "٠٩:٣٠": False,     # Arabic-Indic digits
+    "０９:３０": False,   # Fullwidth digits
+}
+
+def test_validate_time_format():
+    """Check _validate_time_format against the edge cases."""
+    import logging
+    logger = logging.getLogger(__name__)
+
+    with in_temp_dir():
+        from Handlers.Preferences import ShiftTimesHandler
+
+    for time_str, expected in TIME_CASES.items():
+        result = ShiftTimesHandler._validate_time_format(time_str)
+        logger.debug("  %r: %s", time_str, result)
+        assert result is expected, f"{time_str!r}: got {result}, expected {expected}"
+
+    logger.info("✅ Time format validation checks passed")
+
+if __name__ == "__main__":
+    import logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    test_validate_time_format()
@@ -8,7 +8,8 @@ This script:
 - Registers a few basic handlers (/start, text echo, callback queries)
 - Starts polling and prints simple instructions
 
-Stop with Ctrl+C.
+Stop with Ctrl+C. Run it directly; it has no test_* functions so pytest
+collection never starts polling.
 """
 
 from __future__ import annotations
@@ -25,25 +26,36 @@ from Clients.TelegramClient import TelegramClient
 from Config.config import TELEGRAM_BOT_TOKEN
 
 
+# Welcome keyboard, built on first /start (the client needs a token to exist)
+_WELCOME_KB = None
+
+
+def _get_welcome_kb():
+    """Return the shared /start keyboard, building it once."""
+    global _WELCOME_KB
+    if _WELCOME_KB is None:
+        client = TelegramClient()
+        # Use the simpler inline_kb method with explicit button creation
+        _WELCOME_KB = client.inline_kb([
+            client.inline_buttons_row([
+                ("Settings", "settings"),
+                ("Availability", "availability"),
+                ("Documentation", "docs"),
+            ])
+        ])
+    return _WELCOME_KB
+
+
 # -----------------------------
 # Handlers used in the test
 # -----------------------------
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send a welcome message with an inline keyboard to test callbacks."""
-    client = TelegramClient()
-    # Use the simpler inline_kb method with explicit button creation
-    kb = client.inline_kb([
-        client.inline_buttons_row([
-            ("Settings", "settings"),
-            ("Availability", "availability"),
-            ("Documentation", "docs"),
-        ])
-    ])
     await update.effective_chat.send_message(
         "Welcome! This is a test bot.\n"
         "- Send any text and I'll echo it.\n"
         "- Tap a button below to test callback queries.",
-        reply_markup=kb,
+        reply_markup=_get_welcome_kb(),
     )
 
 
@@ -71,7 +83,7 @@ async def on_error(update: Optional[object], context: ContextTypes.DEFAULT_TYPE)
         traceback.print_exception(type(err), err, err.__traceback__)
 
 
-def test_telegram_client() -> bool:
+def run_telegram_client() -> bool:
     """Configure the TelegramClient and start polling for a manual test session."""
     import logging
     logger = logging.getLogger(__name__)
@@ -81,6 +93,15 @@ def test_telegram_client() -> bool:
         logger.error("❌ TELEGRAM_BOT_TOKEN is missing. Define it in your environment or .env file.")
         return False
 
+    # Optional faster event loop; PTB's run_polling picks up the installed policy
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop")
+
     try:
         client = TelegramClient()
         logger.info("✅ TelegramClient initialized successfully")
@@ -93,8 +114,9 @@ def test_telegram_client() -> bool:
 
         logger.info("📱 How to test: open Telegram and interact with the bot (interactive).")
 
-        # Blocking run until Ctrl+C (clears webhook automatically)
-        client.run_polling(drop_pending_updates=True)
+        # Blocking run until Ctrl+C (clears webhook automatically). Pending updates are kept:
+        # Telegram tracks the confirmed offset server-side, so a restart resumes where it stopped
+        client.run_polling(drop_pending_updates=False)
         return True
 
     except KeyboardInterrupt:
@@ -119,7 +141,7 @@ def main():
         logger.info("❌ Test cancelled by user.")
         return
 
-    success = test_telegram_client()
+    success = run_telegram_client()
 
     if success:
         logger.info("🎉 TELEGRAM TEST COMPLETED (bot stopped)")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test TimezoneHandler retrying a timezone save after a failed write.
+"""
+
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.helpers import in_temp_dir
+
+# Mock telegram client for testing
+class MockTelegramClient:
+    def inline_kb(self, buttons):
+        return f"Keyboard with buttons: {buttons}"
+
+def test_failed_save_is_retried():
+    """A failed write must not leave the value cached as saved."""
+    import logging
+    logger = logging.getLogger(__name__)
+
+    with in_temp_dir() as tmp:
+        from Handlers.Preferences import TimezoneHandler
+        from utils import atomic_read_json
+        handler = TimezoneHandler(MockTelegramClient())
+
+        # A regular file where the directory should be makes the write fail
+        blocker = os.path.join(tmp, "blocker")
+        open(blocker, "w").close()
+        handler.config_file = os.path.join(blocker, "tz.json")
+        handler._set_tz("Europe/London")
+        handler._save_timezone()
+        assert handler.config_file not in TimezoneHandler._config_cache
+        logger.info("  Failed write not cached: ok")
+
+        # The same value is written once the path is usable again
+        os.remove(blocker)
+        handler._save_timezone()
+        assert atomic_read_json(handler.config_file) == {"timezone": "Europe/London"}
+        assert TimezoneHandler._config_cache[handler.config_file] == {"timezone": "Europe/London"}
+        logger.info("  Retry written: ok")
+
+    logger.info("✅ Timezone save retry checks passed")
+
+if __name__ == "__main__":
+    import logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    test_failed_save_is_retried()
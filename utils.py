@@ -1,23 +1,100 @@
-from datetime import datetime
+from datetime import datetime, tzinfo
+from functools import lru_cache
 import zoneinfo
 import json
+import copy
 import os
-import tempfile
+import threading
+from collections import OrderedDict
 from typing import Any
 
+try:
+    import orjson  # Optional faster JSON codec; the stdlib json module is the fallback
+except ImportError:
+    orjson = None
+
+
+def _json_dumps(data: Any) -> bytes:
+    """Serialize data to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# Both raise a ValueError subclass on malformed input
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# atomic_read_json cache: path -> ((st_ino, st_mtime_ns, st_size), parsed value), LRU order
+_READ_CACHE_SIZE = 128
+_read_cache = OrderedDict()
+_read_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=64)
+def _zone(tz_name: str) -> zoneinfo.ZoneInfo:
+    """Return the ZoneInfo for a timezone name, built once per name."""
+    return zoneinfo.ZoneInfo(tz_name)
+
+
 def to_iso8601(year,month,day,hour,minute,second,tz_name):
-    tz=zoneinfo.ZoneInfo(tz_name)
+    # tz_name may also be a ready tzinfo, which skips the lookup entirely
+    tz=tz_name if isinstance(tz_name, tzinfo) else _zone(tz_name)
     dt=datetime(year,month,day,hour,minute,second,tzinfo=tz)
     return dt.isoformat()
 
 
+def _format_utc_offset(offset) -> str:
+    """Format a UTC offset the way datetime.isoformat does (+HH:MM, with :SS if needed)."""
+    seconds = int(offset.total_seconds())
+    sign = '-' if seconds < 0 else '+'
+    hours, rest = divmod(abs(seconds), 3600)
+    minutes, seconds = divmod(rest, 60)
+    if seconds:
+        return f"{sign}{hours:02d}:{minutes:02d}:{seconds:02d}"
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+
+def to_iso8601_batch(rows, tz_name):
+    """Convert many (year, month, day, hour, minute, second) rows to ISO 8601 strings.
+
+    Same output as calling to_iso8601 per row, but the timezone offset is resolved once per
+    calendar day; only rows on a day with a DST transition go through a full datetime.
+    """
+    tz=tz_name if isinstance(tz_name, tzinfo) else _zone(tz_name)
+    day_offsets = {}  # (year, month, day) -> offset string, or None on transition days
+    out = []
+    for year,month,day,hour,minute,second in rows:
+        key = (year, month, day)
+        if key in day_offsets:
+            off = day_offsets[key]
+        else:
+            first = tz.utcoffset(datetime(year,month,day,0,0,0))
+            last = tz.utcoffset(datetime(year,month,day,23,59,59))
+            off = day_offsets[key] = _format_utc_offset(first) if first == last else None
+        if off is None:
+            out.append(datetime(year,month,day,hour,minute,second,tzinfo=tz).isoformat())
+        else:
+            out.append(f"{year:04d}-{month:02d}-{day:02d}T{hour:02d}:{minute:02d}:{second:02d}{off}")
+    return out
+
+
 def atomic_write_json(path: str, data: Any) -> None:
-    """Write JSON to a file atomically (write to temp then rename)."""
+    """Write JSON to a file atomically and durably (write + fsync temp, then rename).
+
+    `data` may also be already-serialized JSON bytes, which are written as-is.
+    """
+    buf = data if isinstance(data, (bytes, bytearray)) else _json_dumps(data)
     dirpath = os.path.dirname(path) or '.'
-    fd, tmp_path = tempfile.mkstemp(dir=dirpath)
+    fd, tmp_path = _open_temp(path)
     try:
-        with os.fdopen(fd, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        try:
+            # Usually a single write(2); loop only in case of a short write
+            view = memoryview(buf)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
         os.replace(tmp_path, path)
     except Exception:
         try:
@@ -25,14 +102,62 @@ def atomic_write_json(path: str, data: Any) -> None:
         except Exception:
             pass
         raise
+    _fsync_dir(dirpath)
+
+
+def _open_temp(path: str):
+    """Create the temp file for an atomic write of `path`, returning (fd, tmp_path).
+
+    The name is fixed per process and thread, so concurrent writers never collide and no
+    random names are generated. A leftover from a crashed write is removed and recreated.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    try:
+        return os.open(tmp_path, flags, 0o600), tmp_path
+    except FileExistsError:
+        os.remove(tmp_path)
+        return os.open(tmp_path, flags, 0o600), tmp_path
+
+
+def _fsync_dir(dirpath: str) -> None:
+    """Persist a rename by syncing its directory (best effort; not supported everywhere)."""
+    try:
+        dir_fd = os.open(dirpath, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
 
 
 def atomic_read_json(path: str, default: Any = None) -> Any:
-    """Read JSON file returning default on error."""
-    if not os.path.exists(path):
-        return default
+    """Read JSON file returning default on error (including a missing file).
+
+    Parsed files are cached by (inode, mtime, size), so an unchanged file costs one stat.
+    Every call returns a fresh copy; callers may mutate the result.
+    """
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception:
-        return default
\ No newline at end of file
+        st = os.stat(path)
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with _read_cache_lock:
+            cached = _read_cache.get(path)
+            if cached is not None and cached[0] == key:
+                _read_cache.move_to_end(path)
+                # The cached object itself is never handed out
+                return copy.deepcopy(cached[1])
+        with open(path, 'rb') as f:
+            data = _json_loads(f.read())
+    except (OSError, ValueError):
+        # FileNotFoundError is an OSError; bad JSON / encoding is a ValueError
+        return default
+
+    with _read_cache_lock:
+        _read_cache[path] = (key, data)
+        _read_cache.move_to_end(path)
+        if len(_read_cache) > _READ_CACHE_SIZE:
+            _read_cache.popitem(last=False)
+    return copy.deepcopy(data)